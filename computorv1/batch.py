@@ -0,0 +1,114 @@
+import json
+from fractions import Fraction
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from equation_parsing import equation_to_coef_map
+from print_utils import solution_str
+from solving import solve
+
+
+# Bulk solving : one record per non empty input line, in input order. An
+# equation that can't be parsed gives an error record instead of stopping
+# the whole batch
+
+# Lines sent at once to a worker process (with --jobs), to amortize the
+# cost of pickling
+CHUNK_SIZE = 2048
+
+TEXT = "text"
+JSONL = "jsonl"
+FORMATS = (TEXT, JSONL)
+
+
+def solve_equation(equation, exact=False):
+	return solve(equation_to_coef_map(equation, exact))
+
+
+# Yields (equation, solution, error) for each equation, error being None
+# or the message of the parsing or solving error
+def solve_lines(lines, exact=False):
+	for line in lines:
+		equation = line.strip()
+		if equation == '':
+			continue
+		try:
+			yield equation, solve_equation(equation, exact), None
+		except SyntaxError as err:
+			yield equation, None, f"Incorrect equation syntax : {err}"
+		except (ArithmeticError, ValueError) as err:
+			yield equation, None, f"Cannot solve equation : {err.args[-1]}"
+
+
+# Exact values (Fractions) are written as strings, so that they stay exact
+def _json_number(value):
+	if isinstance(value, Fraction):
+		return str(value)
+	value = complex(value)
+	if value.imag == 0:
+		return value.real
+	return [value.real, value.imag]
+
+
+def text_record(equation, solution, error):
+	if error is not None:
+		return f"{equation} => {error}"
+	return f"{equation} => " + solution_str(solution).replace("\n", " | ")
+
+
+def json_record(equation, solution, error):
+	if error is not None:
+		return json.dumps({"equation": equation, "error": error})
+	return json.dumps({
+		"equation": equation,
+		"kind": solution.kind,
+		"reduced_form": solution.reduced_form,
+		"degree": solution.degree,
+		"discriminant": None if solution.discriminant is None else _json_number(solution.discriminant),
+		"roots": [_json_number(root) for root in solution.roots],
+	})
+
+
+record_formatters = {
+	TEXT: text_record,
+	JSONL: json_record,
+}
+
+
+def _chunks(lines, size):
+	lines = iter(lines)
+	chunk = list(islice(lines, size))
+	while len(chunk) > 0:
+		yield chunk
+		chunk = list(islice(lines, size))
+
+
+# Run in the worker processes : the records are formatted there too
+def _solve_chunk(lines, format, exact):
+	record = record_formatters[format]
+	return "".join(record(equation, solution, error) + "\n"
+		for equation, solution, error in solve_lines(lines, exact))
+
+
+# Chunks are solved by 'jobs' processes and written back in input order as
+# soon as they are done. Only a few chunks per process are in flight, so
+# the input is streamed instead of being read at once
+def _solve_batch_parallel(lines, out, format, exact, jobs, chunk_size):
+	with ProcessPoolExecutor(jobs) as executor:
+		pending = deque()
+		for chunk in _chunks(lines, chunk_size):
+			pending.append(executor.submit(_solve_chunk, chunk, format, exact))
+			if len(pending) >= 2 * jobs:
+				out.write(pending.popleft().result())
+		while len(pending) > 0:
+			out.write(pending.popleft().result())
+
+
+# Solves every line of 'lines' and writes one record per line to 'out'
+def solve_batch(lines, out, format=TEXT, jobs=1, chunk_size=CHUNK_SIZE, exact=False):
+	if jobs > 1:
+		_solve_batch_parallel(lines, out, format, exact, jobs, chunk_size)
+		return
+	record = record_formatters[format]
+	for equation, solution, error in solve_lines(lines, exact):
+		out.write(record(equation, solution, error) + "\n")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import random
+from time import perf_counter
+from batch import solve_batch, TEXT
+
+
+def random_side(n_terms):
+	terms = []
+	for k in range(n_terms):
+		sign = random.choice(['+', '-']) if k > 0 else random.choice(['', '-'])
+		coef = round(random.uniform(0, 100), 2)
+		terms.append(f"{sign} {coef} * X^{random.randint(0, 2)}")
+	return " ".join(terms)
+
+
+def random_equations(n):
+	return [f"{random_side(random.randint(1, 6))} = {random_side(random.randint(1, 3))}" for _ in range(n)]
+
+
+# Throughput of the batch mode with 1, 2, 4 and 8 processes
+def bench_jobs(equations):
+	reference = None
+	for jobs in (1, 2, 4, 8):
+		out = io.StringIO()
+		t = perf_counter()
+		solve_batch(equations, out, TEXT, jobs)
+		t = perf_counter() - t
+		if reference is None:
+			reference = out.getvalue()
+		assert(out.getvalue() == reference)
+		print(f"jobs {jobs}: {t:6.2f} s, {len(equations) / t:9.0f} equations/s")
+
+
+if __name__ == '__main__':
+	random.seed(42)
+	print(f"--- Bench batch solving ({os.cpu_count()} CPUs) ---")
+	bench_jobs(random_equations(200000))
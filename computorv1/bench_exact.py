@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+import random
+from time import perf_counter
+from batch import solve_lines
+from bench_batch import random_equations
+
+
+# Cost of the exact mode (Fraction coefficients) against floats, on the
+# whole parse and solve of each equation
+def bench_exact(equations):
+	times = {}
+	solutions = {}
+	for exact in (False, True):
+		t = perf_counter()
+		solutions[exact] = [solution for _, solution, _ in solve_lines(equations, exact)]
+		times[exact] = perf_counter() - t
+		kind = "exact" if exact else "float"
+		print(f"{kind}: {times[exact]:6.2f} s, {len(equations) / times[exact]:9.0f} equations/s")
+	print(f"exact mode cost: x{times[True] / times[False]:.2f}")
+	# Rounding residues left by floats change the degree of the equation
+	wrong_degree = sum(1 for s1, s2 in zip(solutions[False], solutions[True]) if s1.degree != s2.degree)
+	print(f"equations whose float degree differs from the exact one: {wrong_degree}")
+
+
+def cancelling_equations(n):
+	equations = []
+	for _ in range(n):
+		a, b = round(random.uniform(0, 1), 1), round(random.uniform(0, 1), 1)
+		equations.append(f"{a} * X^2 + {b} * X^2 + X = {round(a + b, 1)} * X^2 + 1")
+	return equations
+
+
+if __name__ == '__main__':
+	random.seed(42)
+	print("--- Bench random equations ---")
+	bench_exact(random_equations(100000))
+	print()
+	print("--- Bench equations whose X^2 terms cancel out ---")
+	bench_exact(cancelling_equations(10000))
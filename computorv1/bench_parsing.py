@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import random
+import re
+from timeit import timeit
+from equation_parsing import equation_to_coef_list
+
+
+# Previous parser : every token was matched with an uncompiled pattern and
+# the rest of the string was sliced off after it
+def legacy_extract_next_term(expr, term_index):
+	expr = expr.lstrip()
+	m = re.match(r'[+-]?' if term_index == 0 else r'[+-]', expr)
+	sign = m.group(0)
+	expr = expr[m.end(0):].lstrip()
+	m = re.match(r'\d+(?:\.\d*)?|\.\d+', expr)
+	coef = 1.0
+	if m != None:
+		coef = float(m.group(0))
+		expr = expr[m.end(0):].lstrip()
+		if len(expr) > 0 and expr[0] == '*':
+			expr = expr[1:].lstrip()
+	if sign == '-':
+		coef = -coef
+	m = re.match(r'[xX](?:\s*\^\s*(\d+))?', expr)
+	power = 0
+	if m != None:
+		power = int(m.group(1)) if m.group(1) != None else 1
+		expr = expr[m.end(0):].lstrip()
+	return expr, coef, power
+
+
+def legacy_insert_sorted(coef_list, coef, power):
+	if power >= len(coef_list):
+		coef_list.extend(0 for _ in range(len(coef_list), power + 1))
+	coef_list[power] += coef
+
+
+def legacy_coef_list(expr):
+	coef_list = []
+	i = 0
+	while len(expr) > 0:
+		expr, coef, power = legacy_extract_next_term(expr, i)
+		legacy_insert_sorted(coef_list, coef, power)
+		i += 1
+	return coef_list
+
+
+def random_side(n_terms):
+	terms = [f"{round(random.uniform(0, 100), 2)} * X^{random.randint(0, 2)}"]
+	terms.extend(f"{random.choice(['+', '-'])} {round(random.uniform(0, 100), 2)} * X^{random.randint(0, 2)}"
+		for _ in range(n_terms - 1))
+	return " ".join(terms)
+
+
+def bench_parsing(n_terms, legacy_max):
+	side = random_side(n_terms)
+	equation = f"{side} = 0"
+	t = timeit(lambda: equation_to_coef_list(equation), number=1)
+	line = f"{n_terms:8d} terms ({len(equation) / 1e6:5.2f} MB): cursor {t * 1e3:9.1f} ms"
+	if n_terms <= legacy_max:
+		assert(legacy_coef_list(side) == equation_to_coef_list(equation))
+		t_legacy = timeit(lambda: legacy_coef_list(side), number=1)
+		line += f" | slicing {t_legacy * 1e3:9.1f} ms (x{t_legacy / t:.1f})"
+	print(line)
+
+
+if __name__ == '__main__':
+	random.seed(42)
+	print("--- Bench equation parsing ---")
+	for n_terms in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6):
+		bench_parsing(n_terms, legacy_max=10 ** 5)
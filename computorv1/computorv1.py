@@ -1,82 +1,69 @@
 #!/usr/bin/env python3
 
 import sys
-from math import sqrt
-from equation_parsing import equation_to_coef_list, reduced_form
-from print_utils import root_str, print_root
-
-argc = len(sys.argv)
-if argc != 2:
-	print("Usage : python3 computorv1.py \"(equation expression)\"")
-	exit(1)
-equation = sys.argv[1]
-
-
-# Parse the equation
-
-try:
-	coef_list = equation_to_coef_list(equation)
-except SyntaxError as err:
-	print(f"Incorrect equation syntax : {err}")
-	exit(1)
-
-
-# Case '0 = 0'
-
-if len(coef_list) == 0:
-	print("The equation simplifies to '0 = 0', solution is the whole real field")
-	exit(0)
-
-
-# Print reduced form and degree
-
-print("Reduced form:", reduced_form(coef_list))
-print(f"Polynomial degree: {len(coef_list) - 1}")
-
-
-# Print solutions depending on degree
-
-if len(coef_list) > 3:
-	print("The polynomial degree is strictly greater than 2, I can't solve.")
-	exit(0)
-
-elif len(coef_list) == 1:
-	print("There is no solution")
-	exit(0)
-
-elif len(coef_list) == 2:
-	b, a = coef_list
-	root = - b / a
-	print("The unique solution is:")
-	print_root(root)
-
-elif len(coef_list) == 3:
-	c, b, a = coef_list
-	delta = b ** 2 - 4 * a * c
-
-	if delta > 0:
-		delta_sqrt = sqrt(delta)
-		root1 = (- b - delta_sqrt) / (2 * a)
-		root2 = (- b + delta_sqrt) / (2 * a)
-		print("Discriminant is strictly positive, the two solutions are:")
-		print_root(root1)
-		print_root(root2)
-
-	elif delta == 0:
-		root = - b / (2 * a)
-		print("Discriminant is zero, the unique solution is:")
-		print_root(root)
-
+import argparse
+from equation_parsing import equation_to_coef_map
+from print_utils import solution_str
+from solving import solve
+from batch import solve_batch, FORMATS, TEXT
+
+usage = "Usage : python3 computorv1.py [--exact] \"(equation expression)\"\n"\
+	"        python3 computorv1.py --batch [--exact] [--format {text,jsonl}] [--jobs N] [file]"
+
+
+# Argument type of --jobs
+def positive_int(value):
+	n = int(value)
+	if n < 1:
+		raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+	return n
+
+
+# Batch mode : newline-delimited equations from a file or stdin
+def main_batch(argv):
+	argparser = argparse.ArgumentParser(prog="computorv1.py --batch")
+	argparser.add_argument("--format", help="one result record per line, as text or JSON",
+		choices=FORMATS, default=TEXT)
+	argparser.add_argument("--exact", help="exact rational coefficients and roots", action="store_true")
+	argparser.add_argument("-j", "--jobs", help="solve with N processes", type=positive_int, default=1)
+	argparser.add_argument("file_name", nargs='?', default='-',
+		help="file of equations, one per line ('-' for the standard input)")
+	args = argparser.parse_args(argv)
+	if args.file_name == '-':
+		solve_batch(sys.stdin, sys.stdout, args.format, args.jobs, exact=args.exact)
 	else:
-		delta_sqrt_abs = sqrt(abs(delta))
-		real = - b / (2 * a)
-		imag = delta_sqrt_abs / (2 * a)
-		print("Discriminant is strictly negative (no real solution), the two complex solutions are:")
-		if real != 0:
-			print(f"{root_str(real)} + {root_str(abs(imag))} * i")
-			print(f"{root_str(real)} - {root_str(abs(imag))} * i")
-		else:
-			print(f"{root_str(abs(imag))} * i")
-			print(f"-{root_str(abs(imag))} * i")
-
-
+		with open(args.file_name) as f:
+			solve_batch(f, sys.stdout, args.format, args.jobs, exact=args.exact)
+	return 0
+
+
+# Nothing runs at import : the worker processes of --jobs re-import the main
+# module when they are spawned (spawn and forkserver start methods)
+def main(argv):
+	if len(argv) >= 2 and argv[1] == "--batch":
+		return main_batch(argv[2:])
+
+	exact = len(argv) == 3 and argv[1] == "--exact"
+	if len(argv) != 2 and not exact:
+		print(usage)
+		return 1
+	equation = argv[-1]
+
+	# Parse the equation
+	try:
+		coef_map = equation_to_coef_map(equation, exact)
+	except SyntaxError as err:
+		print(f"Incorrect equation syntax : {err}")
+		return 1
+
+	# Solve, then print the reduced form, degree and solutions
+	try:
+		print(solution_str(solve(coef_map)))
+	except (ArithmeticError, ValueError) as err:
+		print(f"Cannot solve equation : {err.args[-1]}")
+		return 1
+	return 0
+
+
+if __name__ == '__main__':
+	exit(main(sys.argv))
@@ -1,26 +1,27 @@
-from term_parsing import extract_next_term
+from fractions import Fraction
+from term_parsing import iter_terms
 
-def _insert_sorted(coef_list, coef, power):
-	if power >= len(coef_list):
-		coef_list.extend(0 for _ in range(len(coef_list), power + 1))
-	coef_list[power] += coef
+# Coefficients are accumulated in a sparse map power -> coef, so that memory
+# stays proportional to the number of terms whatever the powers are. The
+# powers whose terms cancelled out are kept (with a zero coefficient)
 
+def _add_term(coef_map, coef, power):
+	coef_map[power] = coef_map.get(power, 0) + coef
 
-def _expression_to_coef_list(expr):
+
+def _expression_to_coef_map(expr, number):
 	expr = expr.strip()
 	if expr == '':
 		raise SyntaxError("At least one side is empty")
 	if expr == '0':
-		return []
-	coef_list = []
-	i = 0
-	while len(expr) > 0:
-		expr, coef, power = extract_next_term(expr, i)
-		_insert_sorted(coef_list, coef, power)
-		i += 1
-	return coef_list
-
-def equation_to_coef_list(equation):
+		return {}
+	coef_map = {}
+	for coef, power in iter_terms(expr, number):
+		_add_term(coef_map, coef, power)
+	return coef_map
+
+# exact : coefficients as Fractions instead of floats
+def equation_to_coef_map(equation, exact=False):
 	equation = equation.strip()
 	if equation == '':
 		raise SyntaxError("Empty equation")
@@ -28,25 +29,27 @@ def equation_to_coef_list(equation):
 	if len(splitted) != 2:
 		raise SyntaxError("Too many '='")
 	lhs, rhs = splitted
-	poly1 = _expression_to_coef_list(lhs)
-	poly2 = _expression_to_coef_list(rhs)
-	if poly1 == None or poly2 == None:
-		raise SyntaxError("")
-	if len(poly2) > len(poly1):
-		poly1.extend(0 for _ in range(len(poly1), len(poly2) + 1))
-	for i, c in enumerate(poly2):
-		poly1[i] -= c
-	for i in range(len(poly1) - 1, -1, -1):
-		if poly1[i] == 0:
-			poly1.pop(i)
-		else:
-			break
-	return poly1
+	number = Fraction if exact else float
+	coef_map = _expression_to_coef_map(lhs, number)
+	for power, coef in _expression_to_coef_map(rhs, number).items():
+		_add_term(coef_map, -coef, power)
+	return coef_map
+
+# Highest power with a non zero coefficient (-1 for the zero polynomial)
+def polynomial_degree(coef_map):
+	return max((power for power, coef in coef_map.items() if coef != 0), default=-1)
+
+# Dense coefficient list (index = power), up to the degree
+def coef_list_from_map(coef_map):
+	return [coef_map.get(power, 0) for power in range(polynomial_degree(coef_map) + 1)]
+
+def equation_to_coef_list(equation, exact=False):
+	return coef_list_from_map(equation_to_coef_map(equation, exact))
 
-def reduced_form(coef_list):
+def reduced_form(coef_map):
 	expr_list = []
 	first_non_zero = True
-	for power, coef in enumerate(coef_list):
+	for power, coef in sorted(coef_map.items()):
 		if coef == 0:
 			continue
 		if first_non_zero:
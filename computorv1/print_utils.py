@@ -1,7 +1,48 @@
+from fractions import Fraction
+from solving import ALL_REALS, NO_SOLUTION, UNIQUE, POSITIVE_DISCRIMINANT, \
+	ZERO_DISCRIMINANT, NEGATIVE_DISCRIMINANT, NUMERIC, RATIONAL, DEGREE_TOO_HIGH
+
 def root_str(root):
 	if root == 0:
 		return "0"
 	return f"{root:.6f}".rstrip('0').rstrip('.')
 
+# Rational roots of the exact mode are printed as fractions
+def any_root_str(root):
+	if isinstance(root, Fraction):
+		return str(root)
+	return complex_root_str(complex(root))
+
 def print_root(root):
 	print(root_str(root))
+
+def complex_root_str(root):
+	if root.imag == 0:
+		return root_str(root.real)
+	if root.real == 0:
+		return f"{'-' if root.imag < 0 else ''}{root_str(abs(root.imag))} * i"
+	sign = '-' if root.imag < 0 else '+'
+	return f"{root_str(root.real)} {sign} {root_str(abs(root.imag))} * i"
+
+
+solution_headers = {
+	NO_SOLUTION: "There is no solution",
+	UNIQUE: "The unique solution is:",
+	POSITIVE_DISCRIMINANT: "Discriminant is strictly positive, the two solutions are:",
+	ZERO_DISCRIMINANT: "Discriminant is zero, the unique solution is:",
+	NEGATIVE_DISCRIMINANT: "Discriminant is strictly negative (no real solution), the two complex solutions are:",
+	DEGREE_TOO_HIGH: "The polynomial degree is too high to compute its solutions",
+}
+
+def solution_str(solution):
+	if solution.kind == ALL_REALS:
+		return "The equation simplifies to '0 = 0', solution is the whole real field"
+	lines = [f"Reduced form: {solution.reduced_form}", f"Polynomial degree: {solution.degree}"]
+	if solution.kind == NUMERIC:
+		lines.append(f"Numeric approximation of the {solution.degree} solutions (with multiplicity):")
+	elif solution.kind == RATIONAL:
+		lines.append(f"The {solution.degree} solutions are rational (with multiplicity):")
+	else:
+		lines.append(solution_headers[solution.kind])
+	lines.extend(any_root_str(root) for root in solution.roots)
+	return "\n".join(lines)
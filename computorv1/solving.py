@@ -0,0 +1,134 @@
+from fractions import Fraction
+from math import sqrt, isqrt, isfinite
+from equation_parsing import reduced_form, polynomial_degree, coef_list_from_map
+from root_finding import split_rational_roots
+
+
+# Kinds of solution sets
+ALL_REALS = "ALL_REALS"
+NO_SOLUTION = "NO_SOLUTION"
+UNIQUE = "UNIQUE"
+POSITIVE_DISCRIMINANT = "POSITIVE_DISCRIMINANT"
+ZERO_DISCRIMINANT = "ZERO_DISCRIMINANT"
+NEGATIVE_DISCRIMINANT = "NEGATIVE_DISCRIMINANT"
+NUMERIC = "NUMERIC"
+RATIONAL = "RATIONAL"
+DEGREE_TOO_HIGH = "DEGREE_TOO_HIGH"
+
+# Above this degree, the roots are not computed : the numeric solver is
+# quadratic in the degree (under 1 s at degree 500, 2 to 3 s at 1000)
+DENSE_MAX_DEGREE = 500
+
+
+# Result of solve : the reduced form, the degree, the discriminant (degree 2
+# only) and the roots (floats, complexes for a negative discriminant or a
+# numeric approximation, Fractions for the rational roots of the exact mode)
+class Solution:
+	def __init__(self, kind, reduced_form, degree, roots=[], discriminant=None):
+		self.kind = kind
+		self.reduced_form = reduced_form
+		self.degree = degree
+		self.roots = list(roots)
+		self.discriminant = discriminant
+
+
+# Square root of a non negative coefficient : exact for the square of a
+# Fraction (exact mode), a float otherwise
+def _sqrt(value):
+	if isinstance(value, Fraction):
+		num, denum = isqrt(value.numerator), isqrt(value.denominator)
+		if num * num == value.numerator and denum * denum == value.denominator:
+			return Fraction(num, denum)
+	return sqrt(value)
+
+
+# Degree 3 and more : the rational roots are found exactly (floats are
+# taken as the decimals they are written with), the others numerically
+def _solve_high_degree(coef_list, form, degree):
+	exact = all(isinstance(coef, Fraction) for coef in coef_list)
+	rationals, roots = split_rational_roots([Fraction(repr(coef)) if isinstance(coef, float) else coef
+		for coef in coef_list])
+	if not exact:
+		rationals = [float(root) for root in rationals]
+	if len(roots) == 0:
+		return Solution(RATIONAL, form, degree, rationals)
+	roots = sorted(rationals + roots, key=lambda z: (complex(z).imag != 0, complex(z).real, complex(z).imag))
+	return Solution(NUMERIC, form, degree, roots)
+
+
+# coef_map : sparse coefficients, power -> coef (floats, or Fractions in
+# exact mode, where the discriminant and the rational roots stay exact).
+# Raises ValueError for a float coefficient too big to be represented (a
+# Fraction has no such limit), and lets an OverflowError through when the
+# computation itself overflows
+def solve(coef_map):
+	if not all(isfinite(coef) for coef in coef_map.values() if isinstance(coef, float)):
+		raise ValueError("Coefficient too big to be represented")
+
+	degree = polynomial_degree(coef_map)
+
+	if degree < 0:
+		return Solution(ALL_REALS, "0 = 0", 0)
+
+	form = reduced_form(coef_map)
+
+	if degree > DENSE_MAX_DEGREE:
+		return Solution(DEGREE_TOO_HIGH, form, degree)
+
+	coef_list = coef_list_from_map(coef_map)
+
+	if len(coef_list) > 3:
+		return _solve_high_degree(coef_list, form, degree)
+
+	elif len(coef_list) == 1:
+		return Solution(NO_SOLUTION, form, degree)
+
+	elif len(coef_list) == 2:
+		b, a = coef_list
+		return Solution(UNIQUE, form, degree, [- b / a])
+
+	c, b, a = coef_list
+	delta = b ** 2 - 4 * a * c
+
+	if delta > 0:
+		delta_sqrt = _sqrt(delta)
+		root1 = (- b - delta_sqrt) / (2 * a)
+		root2 = (- b + delta_sqrt) / (2 * a)
+		return Solution(POSITIVE_DISCRIMINANT, form, degree, [root1, root2], delta)
+
+	elif delta == 0:
+		return Solution(ZERO_DISCRIMINANT, form, degree, [- b / (2 * a)], delta)
+
+	real = - b / (2 * a)
+	imag = abs(_sqrt(abs(delta)) / (2 * a))
+	return Solution(NEGATIVE_DISCRIMINANT, form, degree, [complex(real, imag), complex(real, -imag)], delta)
+
+
+
+if __name__ == '__main__':
+	from cmath import isfinite as is_finite_complex
+	from equation_parsing import equation_to_coef_map
+	solution = solve(equation_to_coef_map(f"X^{DENSE_MAX_DEGREE} = 1"))
+	assert(solution.kind == NUMERIC and len(solution.roots) == DENSE_MAX_DEGREE)
+	assert(all(is_finite_complex(root) and abs(abs(root) - 1) < 1e-9 for root in solution.roots))
+	solution = solve(equation_to_coef_map(f"X^{DENSE_MAX_DEGREE + 1} = 1"))
+	assert(solution.kind == DEGREE_TOO_HIGH and solution.roots == [])
+	# Coefficients beyond the float range : exact in exact mode only
+	big = "1" + "0" * 400
+	solution = solve(equation_to_coef_map(f"{big} * X = 1", exact=True))
+	assert(solution.kind == UNIQUE and solution.roots == [Fraction(1, 10 ** 400)])
+	solution = solve(equation_to_coef_map(f"{big} * X^2 - {big} = 0", exact=True))
+	assert(solution.kind == POSITIVE_DISCRIMINANT and solution.roots == [-1, 1])
+	# Rational roots of higher degrees
+	solution = solve(equation_to_coef_map("X^3 - 6 * X^2 + 11 * X - 6 = 0", exact=True))
+	assert(solution.kind == RATIONAL and solution.roots == [1, 2, 3])
+	assert(all(isinstance(root, Fraction) for root in solution.roots))
+	solution = solve(equation_to_coef_map("2 * X^3 - 0.5 * X = 0"))
+	assert(solution.kind == RATIONAL and solution.roots == [-0.5, 0, 0.5])
+	solution = solve(equation_to_coef_map("X^3 - 2 * X = 0", exact=True))
+	assert(solution.kind == NUMERIC and solution.roots[1] == 0)
+	try:
+		solve(equation_to_coef_map(f"{big} * X = 1"))
+		assert(False)
+	except ValueError:
+		pass
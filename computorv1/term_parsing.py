@@ -1,64 +1,49 @@
 #!/usr/bin/env python3
 import re
 
-number_pattern = r'\d+(?:\.\d*)?|\.\d+'
-x_power_pattern = r'[xX](?:\s*\^\s*(\d+))?'
-
-def _extract_sign(expr, term_index):
-	sign_pattern = r'[+-]?' if (term_index == 0) else r'[+-]'
-	m = re.match(sign_pattern, expr)
-	if m == None:
-		raise SyntaxError(f"Unexpected token: {expr[0]}")
-	sign = m.group(0)
-	expr = expr[m.end(0):].lstrip()
-	return expr, sign
-
-def _extract_number(expr):
-	m = re.match(number_pattern, expr)
-	if m != None:
-		coef = float(m.group(0))
-		expr = expr[m.end(0):].lstrip()
-		if len(expr) == 0 or expr[0] in ('+', '-'):
-			return (expr, coef, True)
-		if expr[0] != '*':
+# A term is : sign? (number (* )?)? (x (^ power)?)?, with optional spaces.
+# Every group is optional so that the regex matches at any position : the
+# terms of a side are read by finditer, one match per term, and an invalid
+# term shows up as a match missing its mandatory parts
+term_regex = re.compile(r'''
+	\s*(?P<sign>[+-]?)\s*
+	(?:(?P<number>\d+(?:\.\d*)?|\.\d+)\s*(?P<star>\*\s*)?)?
+	(?P<x>[xX](?:\s*\^\s*(?P<power>\d+))?\s*)?
+''', re.VERBOSE)
+
+
+def _check_term(expr, m, term_index):
+	if term_index > 0 and m.group('sign') == '':
+		raise SyntaxError(f"Unexpected token: {expr[m.start('sign')]}")
+	if m.group('number') is not None and m.group('star') is None:
+		# A number without '*' ends the term
+		if m.group('x') is not None or (m.end() < len(expr) and expr[m.end()] not in ('+', '-')):
 			raise SyntaxError("Missing a multiplication operator")
-		expr = expr[1:].lstrip()
-		coef_found = True
-	else:
-		coef = 1.0
-		coef_found = False
-	return expr, coef, coef_found
+	elif m.group('number') is None and m.group('x') is None:
+		raise SyntaxError("Unexpected term")
 
-def _extract_x_power(expr):
-	m = re.match(x_power_pattern, expr)
-	if m != None:
-		power = int(m.group(1)) if m.group(1) != None else 1
-		expr = expr[m.end(0):].lstrip()
-		x_power_found = True
-	else:
-		power = 0
-		x_power_found = False
-	return expr, power, x_power_found
 
-def extract_next_term(expr, term_index):
-	expr = expr.lstrip()
-	# print(f"remaining expr : {expr}")
-	expr, sign = _extract_sign(expr, term_index)
-	expr, coef, coef_found = _extract_number(expr)
-	if sign == '-':
+# Yields the (coef, power) of each term of the side 'expr', reading it
+# with a single cursor instead of slicing the remaining string. 'number'
+# builds the coefficients from their string (float, or Fraction to keep
+# them exact)
+def iter_terms(expr, number=float):
+	for term_index, m in enumerate(term_regex.finditer(expr)):
+		if m.start() == len(expr):
+			return
+		_check_term(expr, m, term_index)
+		coef = number(m.group('number') if m.group('number') is not None else '1')
+		if m.group('sign') == '-':
 			coef = -coef
-	expr, power, x_power_found = _extract_x_power(expr)
-	if not coef_found and not x_power_found:
-		raise SyntaxError("Unexpected term")
-	return (expr, coef, power)
+		if m.group('x') is None:
+			power = 0
+		else:
+			power = int(m.group('power')) if m.group('power') is not None else 1
+		yield coef, power
 
 
 
 if __name__ == '__main__':
-	expr, coef, power = extract_next_term("1", 0)
-	assert(expr == '' and coef == 1 and power == 0)
-	extract_next_term("- x ^ 2", 1)
-	assert(expr == '' and coef == -1 and power == 2)
-	extract_next_term("3*x^0", 0)
-	assert(expr == '' and coef == 3 and power == 0)
-
+	assert(list(iter_terms("1")) == [(1, 0)])
+	assert(list(iter_terms("- x ^ 2")) == [(-1, 2)])
+	assert(list(iter_terms("3*x^0 + 2 * X - 4")) == [(3, 0), (2, 1), (-4, 0)])
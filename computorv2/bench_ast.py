@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import tracemalloc
+from copy import deepcopy
+from timeit import timeit
+from lib.interpreting import interpret, expression_from_str
+from lib.blocks.expressions import Literal
+from lib.blocks.math_types import Complex
+from lib.utils.scope import Scope
+
+def session(body_terms: 'int') -> 'Scope':
+    context = Scope({'i': Complex.i()})
+    body = " + ".join(f"{k} * x ^ {k % 4}" for k in range(body_terms))
+    interpret(f"f(x) = {body}", context)
+    return context
+
+# Previous behaviour: every expansion deep-copied the function body, and
+# every other node of the expression
+def legacy_fun_expanded(node, context):
+    if isinstance(node, Literal) and node.type == Literal.FUNCTION:
+        fun = context[node.value[0]]
+        return deepcopy(fun.expr).substituted(fun.variable_name, node.value[1])
+    return deepcopy(node)
+
+def legacy_expand(expr, context):
+    return deepcopy(expr).replace(context)._shared_mapped_expr(
+        lambda term: term.mapped_term(lambda factor: legacy_fun_expanded(factor, context)))
+
+def allocated(fun) -> 'int':
+    tracemalloc.start()
+    fun()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def bench_expand(body_terms: 'int', calls: 'int', number: 'int'):
+    context = session(body_terms)
+    line = " + ".join(f"f(x + {k})" for k in range(calls))
+    expr = expression_from_str(line, context, ("g", "x"))
+    new = lambda: expr.replace(context).fun_expanded(context)
+    legacy = lambda: legacy_expand(expr, context)
+    m_new, m_legacy = allocated(new), allocated(legacy)
+    t_new = timeit(new, number=number) / number
+    t_legacy = timeit(legacy, number=number) / number
+    print(f"body {body_terms:4d} terms, {calls:3d} calls:"
+          f" deepcopy {m_legacy / 1024:9.1f} KiB {t_legacy * 1e3:8.2f} ms"
+          f" | shared {m_new / 1024:9.1f} KiB {t_new * 1e3:8.2f} ms"
+          f" | allocations /{m_legacy / max(m_new, 1):.1f}")
+
+if __name__ == '__main__':
+    print("--- Bench function expansion (peak traced allocations) ---")
+    for body_terms, calls, number in [(5, 5, 200), (20, 20, 20), (100, 50, 3)]:
+        bench_expand(body_terms, calls, number)
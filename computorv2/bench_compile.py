@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+
+from timeit import timeit
+from lib.interpreting import expression_from_str
+from lib.blocks.math_types import Rational, Complex
+
+def deep_expression(depth: 'int') -> 'str':
+    line = "x"
+    for k in range(depth):
+        line = f"({line} * 2 - {k} / 3 + x ^ 2 % 7)"
+    return line
+
+def bench_deep(depth: 'int', number: 'int'):
+    context = {'i': Complex.i(), 'x': Rational(3, 2)}
+    expr = expression_from_str(deep_expression(depth), context)
+    assert(expr.walk(context) == expr.evaluate(context))
+    t_walk = timeit(lambda: expr.walk(context), number=number)
+    t_compiled = timeit(lambda: expr.evaluate(context), number=number)
+    print(f"depth {depth:4d}: tree-walk {t_walk / number * 1e6:10.1f} us"
+          f" | compiled {t_compiled / number * 1e6:10.1f} us"
+          f" | speedup x{t_walk / t_compiled:.2f}")
+
+if __name__ == '__main__':
+    print("--- Bench compiled expressions ---")
+    for depth, number in [(1, 2000), (10, 500), (50, 100), (200, 20)]:
+        bench_deep(depth, number)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+import random
+from timeit import timeit
+from lib.blocks.math_types import Rational, Matrix
+from lib.utils.linear_algebra import gauss_solve
+from lib.utils.math_utils import np
+
+def random_matrix(h: 'int', w: 'int') -> 'Matrix':
+    return Matrix([[Rational(random.randint(-99, 99), random.randint(1, 9)) for _ in range(w)]
+                   for _ in range(h)])
+
+def timed(fun) -> 'float':
+    return timeit(fun, number=1) * 1e3
+
+# Bareiss elimination on integer rows against Gaussian elimination on
+# Rationals (every step reduces fractions), and against LAPACK on floats
+def bench_linalg(n: 'int', rational_max: 'int', inverse_max: 'int'):
+    a, b = random_matrix(n, n), random_matrix(n, 1)
+    line = f"{n:4d}x{n:<4d} exact: det {timed(a.det):9.1f} ms, solve {timed(lambda: a.solve(b)):9.1f} ms"
+    if n <= inverse_max:
+        line += f", inv {timed(a.inv):9.1f} ms"
+    if n <= rational_max:
+        rows = [a_row + b_row for a_row, b_row in zip(a.data, b.data)]
+        line += f" | Rational Gauss solve {timed(lambda: gauss_solve(rows, n)):9.1f} ms"
+    if np is not None:
+        fa, fb = Matrix(a.float_array()), Matrix(b.float_array())
+        line += f" | float64: det {timed(fa.det):7.3f} ms, solve {timed(lambda: fa.solve(fb)):7.3f} ms"\
+            f", inv {timed(fa.inv):7.3f} ms"
+    print(line)
+
+if __name__ == '__main__':
+    random.seed(42)
+    print("--- Bench determinant, system solving and inverse ---")
+    if np is None:
+        print("(NumPy is not available: float64 timings skipped)")
+    for n in (10, 50, 100, 200, 300):
+        bench_linalg(n, rational_max=100, inverse_max=100)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import random
+from typing import List
+import tracemalloc
+from timeit import timeit
+from lib.blocks.math_types import Rational, Matrix, dot
+from lib.utils.math_utils import np
+
+# Previous product on nested lists: the right operand was transposed
+# again for every row
+def legacy_matmult(rows1: 'List[List]', rows2: 'List[List]') -> 'List[List]':
+    return [[dot(row, col) for col in [list(c) for c in zip(*rows2)]] for row in rows1]
+
+def random_matrix(n: 'int') -> 'Matrix':
+    return Matrix([[Rational(random.randint(-99, 99), random.randint(1, 9)) for _ in range(n)]
+                   for _ in range(n)])
+
+def bench_matmult(n: 'int', legacy_max: 'int'):
+    m1, m2 = random_matrix(n), random_matrix(n)
+    number = max(1, 1000 // (n * n))
+    t_exact = timeit(lambda: Matrix.matmult(m1, m2), number=number) / number
+    line = f"{n:4d}x{n:<4d} exact blocked {t_exact * 1e3:10.1f} ms"
+    if n <= legacy_max:
+        rows1, rows2 = m1.data, m2.data
+        t_legacy = timeit(lambda: legacy_matmult(rows1, rows2), number=number) / number
+        line += f" | previous {t_legacy * 1e3:10.1f} ms (x{t_legacy / t_exact:.1f})"
+    if np is not None:
+        Matrix.set_float_backend(True)
+        t_float = timeit(lambda: Matrix.matmult(m1, m2), number=number) / number
+        f1, f2 = Matrix(m1.float_array(), True), Matrix(m2.float_array(), True)
+        t_blas = timeit(lambda: Matrix.matmult(f1, f2), number=number) / number
+        Matrix.set_float_backend(False)
+        line += f" | float64 {t_float * 1e3:8.2f} ms (BLAS only {t_blas * 1e3:8.3f} ms)"
+    print(line)
+
+def traced_size(build) -> 'int':
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+# Nested lists of Rationals (previous storage) against the flat storage
+def bench_storage(n: 'int'):
+    rows = lambda: [[Rational(random.randint(-99, 99), random.randint(1, 9)) for _ in range(n)] for _ in range(n)]
+    size_nested = traced_size(rows)
+    size_flat = traced_size(lambda: Matrix(rows()))
+    nested1, nested2 = rows(), rows()
+    m1, m2 = Matrix(nested1), Matrix(nested2)
+    t_nested = timeit(lambda: [[x + y for x, y in zip(r1, r2)] for r1, r2 in zip(nested1, nested2)], number=3) / 3
+    t_flat = timeit(lambda: m1 + m2, number=3) / 3
+    t_transpose = timeit(lambda: m1.T(), number=1000) / 1000
+    print(f"{n:4d}x{n:<4d} memory: nested {size_nested / 2**20:7.2f} MiB | flat {size_flat / 2**20:7.2f} MiB"
+          f" | addition: nested {t_nested * 1e3:8.1f} ms, flat {t_flat * 1e3:8.1f} ms"
+          f" | transpose view {t_transpose * 1e6:.1f} us")
+
+if __name__ == '__main__':
+    random.seed(42)
+    print("--- Bench matrix products ---")
+    if np is None:
+        print("(NumPy not installed: no float64 backend)")
+    for n in (10, 100, 500):
+        bench_matmult(n, legacy_max=100)
+    print()
+    print("--- Bench matrix storage ---")
+    for n in (10, 100, 500):
+        bench_storage(n)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+from timeit import timeit
+from lib.interpreting import interpret, expression_from_str
+from lib.parsing.tokenizing import function_argument_names
+from lib.blocks.expressions import Function
+from lib.blocks.optimizer import optimize
+from lib.blocks.math_types import Rational, Complex
+from lib.utils.scope import Scope
+from lib.utils.errors import Error
+
+FIXTURE = "tests_interpreter/functions"
+EXTRA = [
+    "big(x) = 2 * 3 * x ^ 3 + 4 * 5 * x ^ 2 - x * 1 + 0 + 7 * x ^ 3 - 2 * x + 1 / 3",
+    "deep(x) = (x + 1) * (x + 2) * (x + 3) * (x + 4) * 2 * 3",
+]
+
+# Function definitions of the fixture, each stored as parsed and optimized
+def definitions():
+    context = Scope({'i': Complex.i()})
+    with open(FIXTURE) as f:
+        lines = [line.strip() for line in f] + EXTRA
+    for line in lines:
+        left, _, right = line.partition('=')
+        try:
+            interpret(line, context)
+        except Exception:
+            continue
+        if '(' not in left or right.strip().endswith('?'):
+            continue
+        fun_name, variable_name = function_argument_names(left)
+        raw = expression_from_str(right.strip(), context, (fun_name, variable_name)).fun_expanded(context)
+        plain = Function(raw, variable_name)
+        plain._poly = None
+        yield line, context, plain, Function(optimize(raw), variable_name)
+
+def bench(number: 'int'):
+    arg = Rational(2)
+    for line, context, plain, optimized in definitions():
+        try:
+            assert(plain(arg, context) == optimized(arg, context))
+        except Error:
+            continue
+        t_plain = timeit(lambda: plain(arg, context), number=number) / number
+        t_optimized = timeit(lambda: optimized(arg, context), number=number) / number
+        print(f"{line:40.40s}: as parsed {t_plain * 1e6:7.2f} us"
+              f" | optimized {t_optimized * 1e6:7.2f} us | speedup x{t_plain / t_optimized:.2f}")
+
+if __name__ == '__main__':
+    print("--- Bench function bodies at x = 2 (tests_interpreter/functions) ---")
+    bench(5000)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import random
+from timeit import timeit
+from lib.blocks.math_types import Rational
+from lib.blocks.poly import Poly
+from lib.blocks.expressions import Function
+from lib.interpreting import interpret, evaluate_many
+from lib.utils.math_utils import convolve_schoolbook
+from lib.utils.scope import Scope
+
+def random_poly(degree: 'int', exact: 'bool') -> 'Poly':
+    if exact:
+        return Poly({i: Rational(random.randint(-99, 99), random.randint(1, 3)) for i in range(degree + 1)})
+    return Poly({i: random.uniform(-1, 1) for i in range(degree + 1)})
+
+def bench_product(degree: 'int', exact: 'bool', schoolbook_max: 'int'):
+    p, q = random_poly(degree, exact), random_poly(degree, exact)
+    t = timeit(lambda: p * q, number=1)
+    kind = "exact" if exact else "float"
+    line = f"degree {degree:6d} {kind}: {t * 1e3:10.1f} ms"
+    if degree <= schoolbook_max:
+        zero = Rational.zero() if exact else 0.0
+        t_school = timeit(lambda: convolve_schoolbook(p.coefs, q.coefs, zero), number=1)
+        line += f" | schoolbook {t_school * 1e3:10.1f} ms"
+    print(line)
+
+# Function call on a polynomial body: generic compiled expression
+# against Horner's scheme on the stored Poly
+def bench_evaluation(degree: 'int', number: 'int'):
+    context = Scope()
+    body = " + ".join(f"{k + 1} * x ^ {k}" for k in range(degree + 1))
+    interpret(f"f(x) = {body}", context)
+    fun = context['f']
+    generic = Function(fun.expr, fun.variable_name)
+    generic._poly = None
+    x = Rational(3, 2)
+    assert(generic(x, context) == fun(x, context))
+    t_generic = timeit(lambda: generic(x, context), number=number) / number
+    t_horner = timeit(lambda: fun(x, context), number=number) / number
+    xs = [k / 1000 for k in range(1000)]
+    t_many = timeit(lambda: evaluate_many('f', xs, context), number=10) / 10
+    t_loop = timeit(lambda: [generic(v, context, to_float=True) for v in xs], number=10) / 10
+    print(f"degree {degree:4d}: f(3/2) expression {t_generic * 1e6:9.1f} us | Horner {t_horner * 1e6:9.1f} us"
+          f" | 1000 floats: loop {t_loop * 1e3:7.2f} ms, evaluate_many {t_many * 1e3:7.2f} ms")
+
+if __name__ == '__main__':
+    random.seed(42)
+    print("--- Bench dense polynomial products ---")
+    for degree in (10, 100, 1000, 10000):
+        bench_product(degree, exact=True, schoolbook_max=1000)
+    for degree in (10, 100, 1000, 10000):
+        bench_product(degree, exact=False, schoolbook_max=1000)
+    print()
+    print("--- Bench polynomial expansion ---")
+    x_plus_one = Poly.x() + Poly.one()
+    for n in (50, 200, 1000):
+        t = timeit(lambda: x_plus_one ** n, number=1)
+        print(f"(x + 1)^{n}: {t * 1e3:.1f} ms")
+    print()
+    print("--- Bench polynomial function evaluation ---")
+    for degree, number in [(2, 2000), (10, 500), (50, 50)]:
+        bench_evaluation(degree, number)
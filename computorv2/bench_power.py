@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+from timeit import timeit
+from lib.blocks.math_types import Rational, Complex, Matrix
+from lib.blocks.poly import Poly
+
+# Previous implementation: one multiplication per unit of exponent
+def linear_power(value, exponent: 'int', one):
+    res = one
+    for _ in range(exponent):
+        res = res * value
+    return res
+
+def bench(name: 'str', value, exponents, linear_max: 'int', one=None):
+    for exponent in exponents:
+        t = timeit(lambda: value ** exponent, number=1)
+        line = f"{name:22s} ^ {exponent:<8d}: squaring {t * 1e3:10.2f} ms"
+        if one is not None and exponent <= linear_max:
+            t_linear = timeit(lambda: linear_power(value, exponent, one), number=1)
+            line += f" | linear {t_linear * 1e3:10.2f} ms"
+        print(line)
+
+if __name__ == '__main__':
+    print("--- Bench powers ---")
+    exponents = [10, 1000, 10**4, 10**5, 10**6]
+    bench("Rational 3/2", Rational(3, 2), exponents, 10**4, Rational.one())
+    bench("Complex 1 + i", Complex(1, 1), exponents, 10**4, Complex.one())
+    bench("Poly 2x", Poly({1: Rational(2)}), exponents, 10**4, Poly.one())
+    bench("Poly x + 1", Poly({0: Rational(1), 1: Rational(1)}), [10, 100, 300], 300, Poly.one())
+    bench("Matrix [[1,1];[1,0]]", Matrix([[Rational(1), Rational(1)], [Rational(1), Rational(0)]]), exponents, 0)
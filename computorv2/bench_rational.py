@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import tracemalloc
+from timeit import timeit
+from lib.blocks.math_types import Rational, Matrix
+from lib.utils.math_utils import reduce_fraction
+
+# Same layout as Rational before it was slotted, for comparison
+class DictRational:
+    def __init__(self, num: 'int', denum: 'int' = 1):
+        num, denum = reduce_fraction(num, denum)
+        self.num = num
+        self.denum = denum
+
+def traced_size(build) -> 'int':
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+def bench_matrix_memory(n: 'int'):
+    entry = lambda i, j: (i * n + j + 1000, (i + j) % 7 + 2)
+    size_dict = traced_size(lambda: [[DictRational(*entry(i, j)) for j in range(n)] for i in range(n)])
+    size_slots = traced_size(lambda: [[Rational(*entry(i, j)) for j in range(n)] for i in range(n)])
+    print(f"{n}x{n} rational matrix: dict-backed {size_dict / 2**20:.1f} MiB"
+          f" | slotted {size_slots / 2**20:.1f} MiB"
+          f" | ratio {size_dict / size_slots:.2f}")
+
+def bench_operations(number: 'int'):
+    operands = {
+        "integers": (Rational(123456), Rational(-789)),
+        "fractions": (Rational(123456, 7), Rational(-789, 11)),
+    }
+    for name, (a, b) in operands.items():
+        times = [timeit(lambda: a + b, number=number),
+                 timeit(lambda: a * b, number=number),
+                 timeit(lambda: a / b, number=number),
+                 timeit(lambda: a ** 5, number=number)]
+        print(f"{name:9s}: " + " | ".join(f"{op} {t / number * 1e6:6.2f} us"
+                                          for op, t in zip("+*/^", times)))
+
+def bench_matmult(n: 'int', max_denum: 'int'):
+    m = Matrix([[Rational(i * n + j, 1 + (i + j) % max_denum) for j in range(n)] for i in range(n)])
+    t = timeit(lambda: Matrix.matmult(m, m), number=1)
+    print(f"{n}x{n} matmult (denominators up to {max_denum}): {t * 1e3:.1f} ms")
+
+if __name__ == '__main__':
+    print("--- Bench Rational operations ---")
+    bench_operations(100000)
+    print()
+    print("--- Bench Rational accumulation ---")
+    bench_matmult(50, 1)
+    bench_matmult(50, 5)
+    print()
+    print("--- Bench Rational memory ---")
+    bench_matrix_memory(500)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+import random
+from timeit import timeit
+from lib.blocks.math_types import Rational
+from lib.blocks.poly import Poly
+from lib.utils.root_finding import find_roots
+
+def bench_degree(degree: 'int', number: 'int'):
+    coefs = [random.uniform(-10, 10) for _ in range(degree + 1)]
+    roots = find_roots(coefs)
+    # Backward error: largest |p(z)| relative to the size of the terms
+    residue = max(abs(sum(c * z ** i for i, c in enumerate(coefs)))
+                  / sum(abs(c) * abs(z) ** i for i, c in enumerate(coefs)) for z in roots)
+    t = timeit(lambda: find_roots(coefs), number=number)
+    poly = Poly({i: Rational(random.randint(-10, 10)) for i in range(degree + 1)} | {degree: Rational(1)})
+    t_exact = timeit(lambda: poly.roots(), number=number)
+    print(f"degree {degree:3d}: float coefficients {t / number * 1e3:8.2f} ms (residue {residue:.1e})"
+          f" | exact Poly with square-free split {t_exact / number * 1e3:8.2f} ms")
+
+if __name__ == '__main__':
+    random.seed(0)
+    print("--- Bench root finding ---")
+    for degree, number in [(3, 200), (4, 200), (5, 50), (10, 20), (20, 5), (50, 2)]:
+        bench_degree(degree, number)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+
+from copy import deepcopy
+from timeit import timeit
+from lib.interpreting import interpret, expression_from_str
+from lib.blocks.math_types import Rational, Complex, Matrix
+from lib.utils.scope import Scope
+
+def session(n_variables: 'int') -> 'Scope':
+    context = Scope({'i': Complex.i()})
+    for k in range(n_variables):
+        if k % 100 == 0:
+            context[f"m{k}"] = Matrix([[Rational(k), Rational(1, k + 1)], [Rational(2), Complex(1, k)]])
+        else:
+            context[f"v{k}"] = Rational(k, 7)
+    interpret("f(x) = 2 * x + 1", context)
+    interpret("g(x) = f(x) * f(x + 1)", context)
+    return context
+
+def bench_calls(n_variables: 'int', number: 'int'):
+    context = session(n_variables)
+    call = expression_from_str("g(3)", context)
+    t_call = timeit(lambda: call.evaluate(context), number=number)
+    t_copy = timeit(lambda: deepcopy(context.frame), number=max(1, number // 100))
+    print(f"{n_variables:6d} variables: g(3) {t_call / number * 1e6:8.1f} us"
+          f" | one context deepcopy {t_copy / max(1, number // 100) * 1e6:10.1f} us")
+
+if __name__ == '__main__':
+    print("--- Bench function calls against session size ---")
+    for n_variables in (0, 100, 1000, 10000):
+        bench_calls(n_variables, 1000)
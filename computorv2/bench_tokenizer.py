@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import re
+from timeit import timeit
+from lib.parsing.tokenizing import tokenize, Lexer, Token, punctuation_dict, is_literal
+
+# Previous implementation: findall, fullmatch validation of every token,
+# then classification of the strings again by the lexer
+legacy_patterns = [
+    r'\(', r'\)', r'\[', r'\]', ',', ';',
+    r'\+', r'\-', r'\*{1,2}', '/', '%', r'\^', '=',
+    r'[a-zA-Z]+', r'\d+(?:\.\d*)?', r'\S'
+]
+legacy_pattern = '|'.join(legacy_patterns)
+legacy_pattern_valid = '|'.join(legacy_patterns[:-1])
+
+def legacy_tokenize(line: 'str') -> 'list':
+    tokens = re.findall(legacy_pattern, line)
+    for token in tokens:
+        if not re.fullmatch(legacy_pattern_valid, token):
+            raise ValueError(token)
+    return tokens
+
+def legacy_classify(tokens: 'list') -> 'list':
+    res = []
+    for s in tokens:
+        if s in punctuation_dict:
+            res.append(Token(punctuation_dict[s], s))
+        else:
+            assert(is_literal(s))
+            res.append(Token("LITERAL", s))
+    return res
+
+def consume(lexer: 'Lexer') -> None:
+    while lexer.next_token().type != Token.EOF:
+        pass
+
+def make_input(size: 'int') -> 'str':
+    line = "funB(y) = 43 * y / (4.1 % 2. * y) + [[1,2];[3,2]] ** matA - 2x^2 "
+    return line * (size // len(line))
+
+if __name__ == '__main__':
+    print("--- Bench tokenizer (1 MB input) ---")
+    text = make_input(1 << 20)
+    assert(len(tokenize(text)) == len(legacy_tokenize(text)))
+    number = 3
+    t_legacy = timeit(lambda: legacy_classify(legacy_tokenize(text)), number=number) / number
+    t_new = timeit(lambda: consume(Lexer(tokenize(text))), number=number) / number
+    mb = len(text) / (1 << 20)
+    print(f"findall + fullmatch + classify: {t_legacy:6.3f} s ({mb / t_legacy:6.2f} MB/s)")
+    print(f"compiled scanner + lexer:       {t_new:6.3f} s ({mb / t_new:6.2f} MB/s)"
+          f" | speedup x{t_legacy / t_new:.2f}")
@@ -2,39 +2,90 @@
 
 import sys
 import argparse
-from lib.interpreting import interpret
-from lib.blocks.math_types import Complex
+from typing import Iterable
+from lib.interpreting import interpret, builtin_functions
+from lib.blocks.math_types import Complex, Matrix
+from lib.blocks.expressions import Function
 from lib.utils.python_types import Context
+from lib.utils.scope import Scope
+from lib.parsing.parse_cache import ParseCache
 from lib.utils.errors import Error
 import readline # for extended 'input()' function
 
-def try_interpret(line: 'str', context: 'Context', debug: 'bool' = False):
+# Output gathered and written by blocks of lines, instead of one write per
+# result (block_size = 1 writes right away)
+class BlockWriter:
+    def __init__(self, stream, block_size: 'int' = 1) -> None:
+        self.stream = stream
+        self.block_size = block_size
+        self.lines = []
+
+    def print(self, value = "") -> None:
+        self.lines.append(f"{value}\n")
+        if len(self.lines) >= self.block_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self.stream.write("".join(self.lines))
+        self.stream.flush()
+        self.lines.clear()
+
+def try_interpret(line: 'str', context: 'Context', out: 'BlockWriter', debug: 'bool' = False,
+                  memo_size: 'int' = 0, parse_cache: 'ParseCache' = None, quiet: 'bool' = False):
     if len(line.strip()) == 0:
         return
     try:
-        interpret(line, context)
+        out.print(interpret(line, context, memo_size, parse_cache))
         if debug:
-            context_str = {k: str(v).replace('\n', ';') for k, v in context.items()}
-            print(f"context is now : {context_str}")
+            context_str = {k: str(v).replace('\n', ';') for k, v in context.frame.items()}
+            out.print(f"context is now : {context_str}")
+            if memo_size > 0:
+                memo_str = {k: v.memo_info() for k, v in context.frame.items() if isinstance(v, Function)}
+                out.print(f"function memos : {memo_str}")
+            if parse_cache is not None:
+                out.print(f"parse cache : {parse_cache.info()}")
     except Error as e:
-        print(e)
-    print()
+        out.print(e)
+    if not quiet:
+        out.print()
+
+# Lines are read lazily, so that scripts of any size run in constant memory
+def interpret_stream(lines: 'Iterable[str]', context: 'Context', out: 'BlockWriter', args) -> None:
+    try:
+        for line in lines:
+            if not args.quiet:
+                out.print("> " + line)
+            try_interpret(line, context, out, args.debug, args.memo, parse_cache, args.quiet)
+    finally:
+        out.flush()
 
 argparser = argparse.ArgumentParser()
 argparser.add_argument("-d", "--debug", help="print context after each action", action="store_true")
-argparser.add_argument('file_name', nargs='?', default=None)
+argparser.add_argument("-m", "--memo", help="memoize up to MEMO results per function", type=int, default=0)
+argparser.add_argument("-c", "--cache", help="keep up to CACHE parsed lines (0 to disable)", type=int, default=128)
+argparser.add_argument("-f", "--float-matrices", help="compute matrix products in float64 with NumPy", action="store_true")
+argparser.add_argument("-q", "--quiet", help="only print the results (no echo of the input lines)", action="store_true")
+argparser.add_argument("-b", "--block", help="write the output of a script by blocks of BLOCK lines", type=int, default=4096)
+argparser.add_argument('file_name', nargs='?', default=None, help="script to run ('-' for the standard input)")
 args = argparser.parse_args()
 
-context = {'i': Complex.i()}
+if args.float_matrices and not Matrix.set_float_backend(True):
+    print("NumPy is not available, matrix products stay exact", file=sys.stderr)
 
-if args.file_name is not None:
-    fname = args.file_name
-    print(f"Interpreting file {fname}")
-    with open(fname) as f:
-        for line in f.readlines():
-            print("> " + line)
-            try_interpret(line, context, args.debug)
-else:
+context = Scope({'i': Complex.i()}, parent=Scope(builtin_functions()))
+parse_cache = ParseCache(args.cache)
+
+if args.file_name is None and sys.stdin.isatty():
+    out = BlockWriter(sys.stdout)
     while True:
         line = input('> ')
-        try_interpret(line, context, args.debug)
+        try_interpret(line, context, out, args.debug, args.memo, parse_cache)
+elif args.file_name is None or args.file_name == '-':
+    interpret_stream(sys.stdin, context, BlockWriter(sys.stdout, args.block), args)
+else:
+    fname = args.file_name
+    out = BlockWriter(sys.stdout, args.block)
+    if not args.quiet:
+        out.print(f"Interpreting file {fname}")
+    with open(fname) as f:
+        interpret_stream(f, context, out, args)
@@ -1,13 +1,19 @@
-from typing import Union, List, Any, Callable
-from copy import deepcopy
+from typing import Union, List, Any, Callable, Tuple, Dict, Set
+from collections import OrderedDict
 from functools import reduce
+from weakref import WeakSet
+import operator
 
-from .math_types import Matrix
+from .math_types import Rational, Complex, Matrix, float_value
 from .poly import Poly
 from ..parsing.tokenizing import Token, tokens_str
 from ..utils.python_types import Factor, Value, Context
-from ..utils.errors import UnknownFunctionError, InvalidMatMultUseError, \
-                           NonPolynomialEquation
+from ..utils.scope import Scope
+from ..utils.math_utils import np
+from ..utils.errors import Error, UnknownFunctionError, InvalidMatMultUseError, \
+                           NonPolynomialEquation, ConversionError, ArgumentCountError, \
+                           InvalidArgumentError, ComplexExponentError, \
+                           NonIntegerExponentError
 
 def matmult(m1: 'Matrix', m2: 'Matrix') -> Matrix:
     if not isinstance(m1, Matrix) or not isinstance(m2, Matrix):
@@ -15,28 +21,57 @@ def matmult(m1: 'Matrix', m2: 'Matrix') -> Matrix:
     return Matrix.matmult(m1, m2)
 
 
-def do_op(op: 'str', l1, l2) -> 'Value':
+binary_operations = {
+    Token.PLUS: operator.add,
+    Token.MINUS: operator.sub,
+    Token.MULT: operator.mul,
+    Token.DIV: operator.truediv,
+    Token.MOD: operator.mod,
+    Token.POW: operator.pow,
+    Token.MATMULT: matmult,
+}
+
+
+# Power of the to_float compilation: only integer exponents, as for the
+# exact values (exponent_check), so that a float run never computes a
+# value that the exact evaluation refuses
+def float_power(base, exponent) -> 'Value':
+    if np is not None and isinstance(exponent, np.ndarray):
+        if np.iscomplexobj(exponent):
+            if np.any(exponent.imag != 0):
+                raise ComplexExponentError()
+            exponent = exponent.real
+        if np.any(exponent != np.round(exponent)):
+            raise NonIntegerExponentError()
+        return base ** exponent
+    if isinstance(exponent, complex):
+        if exponent.imag != 0:
+            raise ComplexExponentError()
+        exponent = exponent.real
+    if not float(exponent).is_integer():
+        raise NonIntegerExponentError()
+    return base ** int(exponent)
+
+
+def do_op(op: 'int', l1, l2) -> 'Value':
     if l1 is None:
         return l2
     elif l2 is None:
         return l1
-    if op == Token.PLUS:
-        return l1 + l2
-    elif op == Token.MINUS:
-        return l1 - l2
-    elif op == Token.MULT:
-        return l1 * l2
-    elif op == Token.DIV:
-        return l1 / l2
-    elif op == Token.MOD:
-        return l1 % l2
-    elif op == Token.POW:
-        return l1 ** l2
-    elif op == Token.MATMULT:
-        return matmult(l1, l2)
-
-
-def new_sign(sign1: 'str', sign2: 'str'):
+    return binary_operations[op](l1, l2)
+
+
+def get_function(fun_name: 'str', context: 'Context', arg: 'Any' = None) -> 'Function':
+    if not fun_name in context:
+        raise UnknownFunctionError(fun_name)
+    fun = context[fun_name]
+    # User functions take a single argument
+    if isinstance(arg, Arguments) and not isinstance(fun, Builtin):
+        raise ArgumentCountError(fun_name, 1, len(arg.args))
+    return fun
+
+
+def new_sign(sign1: 'int', sign2: 'int'):
     if sign1 == sign2:
         return Token.PLUS
     else:
@@ -51,61 +86,118 @@ class Literal:
     FUN_VARIABLE = "FUN_VARIABLE"
 
     # unit_literal -> value: Rational | Complex | str
-    # function -> value: tuple[fname: str, arg: str | Rational | Complex | Matrix]
+    # function -> value: tuple[fname: str, arg: Expr | Literal | Arguments]
     # matrix -> value: Matrix[Rational | Complex | str]
     def __init__(self, type: 'str', value: 'Any'): #, sign: 'str' = Token.PLUS):
         self.type = type
         self.value = value
+        self._compiled: 'Dict[bool, Callable[[Context], Value]]' = {}
 
-    def evaluate(self, context: 'Context') -> 'Value':
+    def walk(self, context: 'Context') -> 'Value':
         if self.type == Literal.NUMBER:
             return self.value
         elif self.type == Literal.VARIABLE:
             return context[self.value]
         elif self.type == Literal.FUNCTION:
             fun_name, arg = self.value
-            if not fun_name in context:
-                raise UnknownFunctionError(fun_name)
-            # if arg.type not in (Literal.NUMBER, Literal.MATRIX, Literal.VARIABLE):
-            #     raise Exception()
-            fun_expr, variable_str = context[fun_name]
-            arg_value = arg.evaluate(context)
-            context_fun = deepcopy(context)
-            context_fun[variable_str] = arg_value
-            # context_fun = {variable_str: arg_value}
-            return fun_expr.evaluate(context_fun)
+            fun = get_function(fun_name, context, arg)
+            return fun.walk(arg.walk(context), context)
         elif self.type == Literal.MATRIX:
-            return Matrix.elementwise_unary_operation(lambda x: x.evaluate(context), self.value)
+            return Matrix.elementwise_unary_operation(lambda x: x.walk(context), self.value)
         elif self.type == Literal.FUN_VARIABLE:
             if not self.value in context:
                 raise Exception()
             return context[self.value]
 
-    def replace(self, context: 'Context') -> None:
+    # With to_float, constants are converted to Python floats / complexes
+    # so that the compiled function can run on floats or NumPy arrays
+    def compile(self, to_float: 'bool' = False) -> 'Callable[[Context], Value]':
+        if self.type == Literal.NUMBER:
+            value = float_value(self.value) if to_float else self.value
+            return lambda context: value
+        elif self.type == Literal.VARIABLE:
+            name = self.value
+            if to_float:
+                return lambda context: float_value(context[name])
+            return lambda context: context[name]
+        elif self.type == Literal.FUNCTION:
+            fun_name, arg = self.value
+            arg_fun = arg.compile(to_float)
+            def call(context):
+                fun = get_function(fun_name, context, arg)
+                return fun(arg_fun(context), context, to_float)
+            return call
+        elif self.type == Literal.MATRIX:
+            if to_float:
+                raise ConversionError(self.value, float)
+            rows = [[el.compile() for el in row] for row in self.value.data]
+            return lambda context: Matrix([[f(context) for f in row] for row in rows])
+        elif self.type == Literal.FUN_VARIABLE:
+            name = self.value
+            def fun_variable(context):
+                if not name in context:
+                    raise Exception()
+                return context[name]
+            return fun_variable
+
+    def compiled(self, to_float: 'bool' = False) -> 'Callable[[Context], Value]':
+        if to_float not in self._compiled:
+            self._compiled[to_float] = self.compile(to_float)
+        return self._compiled[to_float]
+
+    def evaluate(self, context: 'Context') -> 'Value':
+        return self.compiled()(context)
+
+    # Nodes are not modified once parsed: substitutions return new nodes
+    # sharing the unchanged subtrees, or the node itself if nothing changed
+    def replace(self, context: 'Context') -> 'Literal':
         if self.type == Literal.VARIABLE and self.value in context:
-            self.type = Literal.NUMBER
-            self.value = context[self.value]
+            return Literal(Literal.NUMBER, context[self.value])
         elif self.type == Literal.FUNCTION:
-            self.value[1].replace(context)
+            fun_name, arg = self.value
+            new_arg = arg.replace(context)
+            if new_arg is not arg:
+                return Literal(Literal.FUNCTION, (fun_name, new_arg))
+        return self
+
+    # Replaces the variable 'name' by the node 'factor'
+    def substituted(self, name: 'str', factor: 'Factor') -> 'Factor':
+        if self.type in (Literal.VARIABLE, Literal.FUN_VARIABLE) and self.value == name:
+            return factor
+        elif self.type == Literal.FUNCTION:
+            fun_name, arg = self.value
+            new_arg = arg.substituted(name, factor)
+            if new_arg is not arg:
+                return Literal(Literal.FUNCTION, (fun_name, new_arg))
+        return self
 
     def contains_variables(self) -> None:
         return self.type in (Literal.VARIABLE, Literal.FUN_VARIABLE)
 
+    # Names looked up in the context at evaluation time
+    def referenced_names(self) -> 'Set[str]':
+        if self.type == Literal.VARIABLE:
+            return {self.value}
+        elif self.type == Literal.FUNCTION:
+            return {self.value[0], *self.value[1].referenced_names()}
+        elif self.type == Literal.MATRIX:
+            return set().union(*(el.referenced_names() for row in self.value.data for el in row))
+        return set()
+
+    # Inlines the body of the called function, with the argument in place
+    # of its variable
     def fun_expanded(self, context: 'Context') -> 'Union[Expr, Literal]':
         if self.type == Literal.FUNCTION:
             fun_name, arg = self.value
-            if not fun_name in context:
-                raise UnknownFunctionError(fun_name)
-            # if arg.type not in (Literal.NUMBER, Literal.MATRIX, Literal.VARIABLE, Literal.FUN_VARIABLE):
-            #     raise Exception()
-            # arg : replace VARIABLE -> FUN_VARIABLE ?
-            # OU se debarasser de Literal.FUN_VARIABLE
-            fun_expr, variable_name = context[fun_name]
-            fun_expr = deepcopy(fun_expr)
-            fun_expr.replace({variable_name : arg})
-            return fun_expr
-        else:
-            return deepcopy(self)
+            fun = get_function(fun_name, context, arg)
+            new_arg = arg.fun_expanded(context)
+            # Builtins have no body: only their arguments are expanded
+            if isinstance(fun, Builtin):
+                return self if new_arg is arg else Literal(Literal.FUNCTION, (fun_name, new_arg))
+            if isinstance(new_arg, Expr) and len(new_arg.terms) == 1 and new_arg.terms[0].is_single_factor():
+                new_arg = new_arg.terms[0].factor_first
+            return fun.expr.substituted(fun.variable_name, new_arg)
+        return self
 
 
     def __str__(self, verbose: 'bool' = False) -> 'str':
@@ -129,47 +221,123 @@ class Literal:
 # term: 'factor' ((MATMULT | MULT | DIV | MOD | POW) factor)*
 class Term:
 
-    def __init__(self, factor: 'Factor', sign: 'str' = Token.PLUS):
+    def __init__(self, factor: 'Factor', sign: 'int' = Token.PLUS):
         self.factor_first: 'Factor' = factor
         self.factors: 'List[Factor]' = []
-        self.operations: 'List[str]' = []
-        self.sign: 'str' = sign
+        self.operations: 'List[int]' = []
+        self.sign: 'int' = sign
+        self._compiled: 'Dict[bool, Callable[[Context], Value]]' = {}
 
-    def set_sign(self, sign: 'str') -> None:
+    def set_sign(self, sign: 'int') -> None:
         self.sign = sign
+        self._compiled = {}
 
-    def apply_sign(self, sign) -> None:
-        if self.sign == sign:
-            self.sign = Token.PLUS
-        else:
-            self.sign = Token.MINUS
+    def signed(self, sign: 'int') -> 'Term':
+        res = self.copy()
+        res.sign = new_sign(self.sign, sign)
+        return res
 
-    def push_back(self, op: 'str', factor: 'Factor') -> None:
+    def push_back(self, op: 'int', factor: 'Factor') -> None:
         self.factors.append(factor)
         self.operations.append(op)
+        self._compiled = {}
 
-    def extend(self, op: 'str', other: 'Term') -> None:
+    def extend(self, op: 'int', other: 'Term') -> None:
         self.operations.extend([op, *other.operations])
         self.factors.extend([other.factor_first, *other.factors])
+        self._compiled = {}
 
     def _apply_sign_to_result(self, val: 'Value') -> 'Value':
         return val if self.sign == Token.PLUS else -val
 
+    def is_single_factor(self) -> 'bool':
+        return self.sign == Token.PLUS and len(self.factors) == 0
+
+    # Shallow copy, sharing the factors
+    def copy(self) -> 'Term':
+        res = Term(self.factor_first, self.sign)
+        res.factors = list(self.factors)
+        res.operations = list(self.operations)
+        return res
+
     def mapped_term(self, map_fun: 'Callable') -> 'Term':
         res = Term(map_fun(self.factor_first), self.sign)
         for op, factor in zip(self.operations, self.factors):
             res.push_back(op, map_fun(factor))
         return res
 
-    def evaluate(self, context: 'Context') -> 'Value':
-        scalar_term = self.mapped_term(lambda factor: factor.evaluate(context))
+    # Term with the new factors (factor_first included), or self when every
+    # factor is unchanged
+    def _with_factors(self, factors: 'List[Factor]') -> 'Term':
+        if factors[0] is self.factor_first and \
+                all(f1 is f2 for f1, f2 in zip(factors[1:], self.factors)):
+            return self
+        res = Term(factors[0], self.sign)
+        res.factors = factors[1:]
+        res.operations = list(self.operations)
+        return res
+
+    # Same as mapped_term, but returns self when every factor is unchanged
+    def _shared_mapped_term(self, map_fun: 'Callable') -> 'Term':
+        return self._with_factors([map_fun(f) for f in [self.factor_first, *self.factors]])
+
+    def walk(self, context: 'Context') -> 'Value':
+        scalar_term = self.mapped_term(lambda factor: factor.walk(context))
         f = lambda l1, l2: do_op(Token.POW, l1, l2)
         scalar_term.do_one_operation(Token.POW, binary_fun=f)
         res = scalar_term.factor_first
-        for op, factor in zip(self.operations, scalar_term.factors):
+        for op, factor in zip(scalar_term.operations, scalar_term.factors):
             res = do_op(op, res, factor)
         return self._apply_sign_to_result(res)
 
+    @classmethod
+    def _compile_power_chain(cl, funs: 'List[Callable]', to_float: 'bool') -> 'Callable[[Context], Value]':
+        if len(funs) == 1:
+            return funs[0]
+        base, exponents = funs[0], funs[1:]
+        pow_fun = float_power if to_float else operator.pow
+        def power_chain(context):
+            res = base(context)
+            for f in exponents:
+                res = pow_fun(res, f(context))
+            return res
+        return power_chain
+
+    def compile(self, to_float: 'bool' = False) -> 'Callable[[Context], Value]':
+        # POW is resolved first (left to right), the other operations
+        # are then applied left to right on the resulting chains
+        chains = [[self.factor_first.compile(to_float)]]
+        operations = []
+        for op, factor in zip(self.operations, self.factors):
+            if op == Token.POW:
+                chains[-1].append(factor.compile(to_float))
+            else:
+                operations.append(binary_operations[op])
+                chains.append([factor.compile(to_float)])
+        funs = [Term._compile_power_chain(chain, to_float) for chain in chains]
+        first = funs[0]
+        rest = list(zip(operations, funs[1:]))
+        negate = self.sign != Token.PLUS
+        if len(rest) == 0:
+            if negate:
+                return lambda context: -first(context)
+            return first
+        def term(context):
+            res = first(context)
+            for op, f in rest:
+                res = op(res, f(context))
+            return -res if negate else res
+        return term
+
+    def compiled(self, to_float: 'bool' = False) -> 'Callable[[Context], Value]':
+        # Cached until the term is modified through one of its methods
+        if to_float not in self._compiled:
+            self._compiled[to_float] = self.compile(to_float)
+        return self._compiled[to_float]
+
+    def evaluate(self, context: 'Context') -> 'Value':
+        return self.compiled()(context)
+
     def contains_variables(self) -> 'bool':
         for factor in [self.factor_first, *self.factors]:
             if isinstance(factor, Literal) and factor.type in (Literal.FUN_VARIABLE, Literal.VARIABLE):
@@ -178,7 +346,7 @@ class Term:
                 return True
         return False
 
-    def do_one_operation(self, op: 'str', binary_fun: 'Callable' = None) -> None:
+    def do_one_operation(self, op: 'int', binary_fun: 'Callable' = None) -> None:
         factors = [self.factor_first, *self.factors]
         operations = []
         i = 0
@@ -197,25 +365,31 @@ class Term:
         self.factor_first = factors[0]
         self.factors = factors[1:]
         self.operations = operations
+        self._compiled = {}
 
-    def do_modulos(self):
+    def do_modulos(self) -> 'Term':
+        if Token.MOD not in self.operations:
+            return self
         def f(f1: 'Factor', f2: 'Factor'):
             if f1.contains_variables() or f2.contains_variables():
                 raise NonPolynomialEquation()
             return Literal(Literal.NUMBER, f1.evaluate(set()) % f2.evaluate(set()))
-        self.do_one_operation(Token.MOD, binary_fun=f)
+        res = self.copy()
+        res.do_one_operation(Token.MOD, binary_fun=f)
+        return res
 
     def is_polynomial(self):
         if not all(op in (Token.MULT, Token.DIV, Token.POW) for op in self.operations):
             return False
         op_factors = zip([Token.MULT, *self.operations], [self.factor_first, *self.factors])
         for op, factor in op_factors:
-            print(f"op: {op} ({type(op).__name__}), factor : {factor}")
             if isinstance(factor, Expr):
                 if not factor.is_polynomial():
                     return False
             elif isinstance(factor, Literal):
-                assert(factor.type in (Literal.VARIABLE, Literal.FUN_VARIABLE, Literal.NUMBER))
+                # Calls left after expansion are builtin calls
+                if factor.type not in (Literal.VARIABLE, Literal.FUN_VARIABLE, Literal.NUMBER):
+                    return False
             # TODO if variables simplifies to non-variable ?
             if op == Token.DIV and factor.contains_variables():
                 return False
@@ -239,7 +413,7 @@ class Term:
         f = lambda l1, l2: do_op(Token.POW, l1, l2)
         poly_term.do_one_operation(Token.POW, binary_fun=f)
         res = poly_term.factor_first
-        for op, f in zip(self.operations, poly_term.factors):
+        for op, f in zip(poly_term.operations, poly_term.factors):
             res = do_op(op, res, f)
         return self._apply_sign_to_result(res)
         # res = Poly.one()
@@ -251,7 +425,7 @@ class Term:
         # return self._apply_sign_to_result(res)
 
     def _do_op(self, op, other: 'Union[Literal, Term]') -> 'Term':
-        new_term = deepcopy(self)
+        new_term = self.copy()
         if isinstance(other, Literal):
             new_term.push_back(op, other)
         elif isinstance(other, Term):
@@ -262,16 +436,28 @@ class Term:
             raise Exception()
         return new_term
 
-    def replace(self, context: Context):
-        self.factor_first.replace(context)
-        for factor in self.factors:
-            factor.replace(context)
-
-    def fun_expanded(self, context):
-        res = Term(self.factor_first.fun_expanded(context), sign=self.sign)
-        for op, factor in zip(self.operations, self.factors):
-            res.push_back(op, factor.fun_expanded(context))
-        return res
+    def referenced_names(self) -> 'Set[str]':
+        return set().union(*(factor.referenced_names() for factor in [self.factor_first, *self.factors]))
+
+    # The substitutions recurse directly (no mapping helper in between), so
+    # that each nesting level costs as few frames as possible
+    def replace(self, context: Context) -> 'Term':
+        factors = []
+        for f in [self.factor_first, *self.factors]:
+            factors.append(f.replace(context))
+        return self._with_factors(factors)
+
+    def substituted(self, name: 'str', factor: 'Factor') -> 'Term':
+        factors = []
+        for f in [self.factor_first, *self.factors]:
+            factors.append(f.substituted(name, factor))
+        return self._with_factors(factors)
+
+    def fun_expanded(self, context) -> 'Term':
+        factors = []
+        for f in [self.factor_first, *self.factors]:
+            factors.append(f.fun_expanded(context))
+        return self._with_factors(factors)
 
     def __str__(self, first_term : 'bool' = False, verbose: 'bool' = False):
         if first_term:
@@ -290,27 +476,62 @@ class Term:
 # Expr: Sum of Terms
 # expr: 'term' ((PLUS | MINUS) term)*
 class Expr:
-    def __init__(self) -> None:
-        self.terms: 'List[Term]' = []
+    def __init__(self, terms: 'List[Term]' = None) -> None:
+        self.terms: 'List[Term]' = [] if terms is None else terms
+        self._compiled: 'Dict[bool, Callable[[Context], Value]]' = {}
 
-    def apply_sign(self, sign):
+    def signed(self, sign: 'int') -> 'Expr':
         # distibutivity of sign over expression
-        for t in self.terms:
-            t.apply_sign(sign)
+        return Expr([t.signed(sign) for t in self.terms])
+
+    # Expr with the new terms, or self if no term changed
+    def _with_terms(self, terms: 'List[Term]') -> 'Expr':
+        if all(t1 is t2 for t1, t2 in zip(terms, self.terms)):
+            return self
+        return Expr(terms)
+
+    # Same as a map over the terms, but returns self if no term changed
+    def _shared_mapped_expr(self, map_fun: 'Callable') -> 'Expr':
+        return self._with_terms([map_fun(t) for t in self.terms])
 
     def push_back(self, term):
         self.terms.append(term)
+        self._compiled = {}
 
     def extend(self, other: 'Expr'):
         self.terms.extend(other.terms)
+        self._compiled = {}
 
-    def evaluate(self, context):
+    def walk(self, context):
         res = None
         for t in self.terms:
-            te = t.evaluate(context)
+            te = t.walk(context)
             res = do_op(Token.PLUS, res, te)
         return res
 
+    def compile(self, to_float: 'bool' = False) -> 'Callable[[Context], Value]':
+        funs = [t.compile(to_float) for t in self.terms]
+        if len(funs) == 0:
+            return lambda context: None
+        first, rest = funs[0], funs[1:]
+        if len(rest) == 0:
+            return first
+        def expr(context):
+            res = first(context)
+            for f in rest:
+                res = res + f(context)
+            return res
+        return expr
+
+    def compiled(self, to_float: 'bool' = False) -> 'Callable[[Context], Value]':
+        # Cached until the expression is modified through one of its methods
+        if to_float not in self._compiled:
+            self._compiled[to_float] = self.compile(to_float)
+        return self._compiled[to_float]
+
+    def evaluate(self, context):
+        return self.compiled()(context)
+
     def is_polynomial(self):
         return all(t.is_polynomial() for t in self.terms)
 
@@ -321,19 +542,32 @@ class Expr:
         polys = [t.to_polynomial() for t in self.terms]
         return reduce(lambda x, y: x + y, polys, Poly.zero())
 
-    def replace(self, context):
+    def referenced_names(self) -> 'Set[str]':
+        return set().union(*(term.referenced_names() for term in self.terms))
+
+    def replace(self, context) -> 'Expr':
+        terms = []
         for term in self.terms:
-            term.replace(context)
+            terms.append(term.replace(context))
+        return self._with_terms(terms)
 
-    def fun_expanded(self, context):
-        res = Expr()
+    def substituted(self, name: 'str', factor: 'Factor') -> 'Expr':
+        terms = []
         for term in self.terms:
-            res.push_back(term.fun_expanded(context))
-        return res
+            terms.append(term.substituted(name, factor))
+        return self._with_terms(terms)
 
-    def do_modulos(self):
+    def fun_expanded(self, context) -> 'Expr':
+        terms = []
         for term in self.terms:
-            term.do_modulos()
+            terms.append(term.fun_expanded(context))
+        return self._with_terms(terms)
+
+    def do_modulos(self) -> 'Expr':
+        terms = []
+        for term in self.terms:
+            terms.append(term.do_modulos())
+        return self._with_terms(terms)
 
 
     # op in (Token.MULT, Token.DIV)
@@ -387,4 +621,174 @@ class Expr:
         return self.__str__()
 
 
+# Arguments of a call with several of them (builtins), evaluated to a tuple
+class Arguments:
+    def __init__(self, args: 'List[Factor]') -> None:
+        self.args = args
+
+    # Arguments with the new args, or self if no argument changed
+    def _with_args(self, args: 'List[Factor]') -> 'Arguments':
+        if all(a1 is a2 for a1, a2 in zip(args, self.args)):
+            return self
+        return Arguments(args)
 
+    def walk(self, context: 'Context') -> 'Tuple[Value, ...]':
+        return tuple(a.walk(context) for a in self.args)
+
+    def compile(self, to_float: 'bool' = False) -> 'Callable[[Context], Tuple[Value, ...]]':
+        funs = [a.compile(to_float) for a in self.args]
+        return lambda context: tuple(f(context) for f in funs)
+
+    def contains_variables(self) -> 'bool':
+        return any(a.contains_variables() for a in self.args)
+
+    def referenced_names(self) -> 'Set[str]':
+        return set().union(*(a.referenced_names() for a in self.args))
+
+    def replace(self, context: 'Context') -> 'Arguments':
+        args = []
+        for a in self.args:
+            args.append(a.replace(context))
+        return self._with_args(args)
+
+    def substituted(self, name: 'str', factor: 'Factor') -> 'Arguments':
+        args = []
+        for a in self.args:
+            args.append(a.substituted(name, factor))
+        return self._with_args(args)
+
+    def fun_expanded(self, context: 'Context') -> 'Arguments':
+        args = []
+        for a in self.args:
+            args.append(a.fun_expanded(context))
+        return self._with_args(args)
+
+    def __str__(self, verbose: 'bool' = False) -> 'str':
+        args = (a.__str__(verbose=verbose) for a in self.args)
+        return "(" + ", ".join(a[1:-1] if a.startswith('(') else a for a in args) + ")"
+
+    def __repr__(self) -> 'str':
+        return self.__str__()
+
+
+# User defined function: a body and the name of its variable. Results of
+# calls on scalars can be kept in a bounded LRU memo (memo_size = 0 to
+# disable it), which must be cleared when a name the body refers to changes
+class Function:
+    # Functions with a memo, by name their body refers to: a new value for
+    # a name only clears the memos indexed under it, so that assignments
+    # stay cheap in long sessions. The bodies of user functions are inlined
+    # at definition, so the names left in a body are its own (variable, and
+    # builtins, which a user function can shadow): there are no indirect
+    # dependencies. Functions leave the index when garbage collected
+    memoized_dependents: 'Dict[str, WeakSet[Function]]' = {}
+
+    @classmethod
+    def invalidate_memos(cl, name: 'str') -> None:
+        for fun in cl.memoized_dependents.get(name, ()):
+            fun.clear_memo()
+
+    def __init__(self, expr: 'Expr', variable_name: 'str', memo_size: 'int' = 0) -> None:
+        self.expr = expr
+        self.variable_name = variable_name
+        self.dependencies: 'Set[str]' = expr.referenced_names()
+        if memo_size > 0:
+            for name in self.dependencies:
+                Function.memoized_dependents.setdefault(name, WeakSet()).add(self)
+        self.memo_size = memo_size
+        self.memo: 'OrderedDict[Value, Value]' = OrderedDict()
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self._poly: 'Union[Poly, None, bool]' = False
+
+    # Body as a polynomial in the variable, or None if it is not one
+    def poly(self) -> 'Union[Poly, None]':
+        if self._poly is False:
+            self._poly = None
+            if self.expr.is_polynomial():
+                try:
+                    self._poly = self.expr.to_polynomial()
+                except Error:
+                    pass
+        return self._poly
+
+    def scope(self, arg_value: 'Value', context: 'Context') -> 'Scope':
+        return Scope({self.variable_name: arg_value}, parent=context)
+
+    def walk(self, arg_value: 'Value', context: 'Context') -> 'Value':
+        return self.expr.walk(self.scope(arg_value, context))
+
+    def _evaluate(self, arg_value: 'Value', context: 'Context', to_float: 'bool') -> 'Value':
+        # Polynomial bodies are evaluated with Horner's scheme on scalars
+        if not to_float and isinstance(arg_value, (Rational, Complex)):
+            poly = self._poly if self._poly is not False else self.poly()
+            if poly is not None:
+                return poly(arg_value)
+        return self.expr.compiled(to_float)(self.scope(arg_value, context))
+
+    def __call__(self, arg_value: 'Value', context: 'Context', to_float: 'bool' = False) -> 'Value':
+        if self.memo_size == 0 or to_float or not isinstance(arg_value, (Rational, Complex)):
+            return self._evaluate(arg_value, context, to_float)
+        if arg_value in self.memo:
+            self.memo_hits += 1
+            self.memo.move_to_end(arg_value)
+            return self.memo[arg_value]
+        self.memo_misses += 1
+        res = self._evaluate(arg_value, context, to_float)
+        self.memo[arg_value] = res
+        if len(self.memo) > self.memo_size:
+            self.memo.popitem(last=False)
+        return res
+
+    def clear_memo(self) -> None:
+        self.memo.clear()
+
+    def memo_info(self) -> 'str':
+        return f"hits={self.memo_hits}, misses={self.memo_misses}, "\
+            f"size={len(self.memo)}/{self.memo_size}"
+
+    def __str__(self) -> 'str':
+        poly = self.poly()
+        if poly is not None:
+            return poly.__str__(variable_name=self.variable_name)
+        return str(self.expr)
+
+    def __repr__(self) -> 'str':
+        return self.__str__()
+
+
+# Function provided by the interpreter, with the call interface of Function:
+# 'fun' takes the argument values, whose types are checked against 'arg_types'
+class Builtin:
+    def __init__(self, name: 'str', fun: 'Callable', arg_types: 'Tuple[type, ...]') -> None:
+        self.name = name
+        self.fun = fun
+        self.arg_types = arg_types
+        self.dependencies: 'Set[str]' = set()
+
+    def walk(self, arg_value: 'Value', context: 'Context') -> 'Value':
+        return self(arg_value, context)
+
+    def __call__(self, arg_value: 'Value', context: 'Context', to_float: 'bool' = False) -> 'Value':
+        args = arg_value if isinstance(arg_value, tuple) else (arg_value,)
+        if len(args) != len(self.arg_types):
+            raise ArgumentCountError(self.name, len(self.arg_types), len(args))
+        for arg, arg_type in zip(args, self.arg_types):
+            if not isinstance(arg, arg_type):
+                raise InvalidArgumentError(self.name, arg, arg_type.__name__)
+        return self.fun(*args)
+
+    def depends_on(self, names: 'Set[str]') -> 'bool':
+        return False
+
+    def clear_memo(self) -> None:
+        pass
+
+    def memo_info(self) -> 'str':
+        return "builtin"
+
+    def __str__(self) -> 'str':
+        return f"<builtin function {self.name}>"
+
+    def __repr__(self) -> 'str':
+        return self.__str__()
@@ -1,11 +1,17 @@
-from typing import List, Union, Callable
+from typing import List, Union, Callable, Any, Tuple, Iterable, Sequence
 
 import functools
-from ..utils.math_utils import ppcm, reduce_fraction
+import operator
+from array import array
+from math import gcd, isfinite
+from fractions import Fraction
+from ..utils.math_utils import reduce_fraction, np
+from ..utils.linear_algebra import bareiss, bareiss_solve, gauss_solve
 from ..utils.errors import ConversionError, DifferentMatrixShapeError, \
                      IncompatibleMatrixShapeError, ModuloError, \
-                     MatrixDivisionOperatorError, DivisionByZeroError, \
-                     ComplexExponentError, NonIntegerExponentError
+                     SingularMatrixError, DivisionByZeroError, \
+                     ComplexExponentError, NonIntegerExponentError, \
+                     NonSquareMatrixError, NotANumberError
 from ..utils.python_types import Scalar, Value, ScalarOrInt, RationalOrInt
 
 def exponent_check(exponent: 'ScalarOrInt'):
@@ -20,51 +26,133 @@ def exponent_check(exponent: 'ScalarOrInt'):
         raise NonIntegerExponentError()
     return exponent.num
 
-def power(scalar: 'Scalar', exponent: 'int', one: 'Scalar') -> 'Scalar':
-    res = one
-    operation = (lambda x, y: x * y) if exponent > 0 else (lambda x, y: x / y)
-    for _ in range(abs(exponent)):
-        res = operation(res, scalar)
-    return res
-
-
+# Exponentiation by squaring, shared by Rational, Complex, Poly and Matrix
+# (which passes its matrix multiplication as 'mult')
+def power(value: 'Any', exponent: 'int', one: 'Any', mult: 'Callable' = operator.mul) -> 'Any':
+    if exponent < 0:
+        return one / power(value, -exponent, one, mult)
+    res = None
+    while exponent > 0:
+        if exponent & 1:
+            res = value if res is None else mult(res, value)
+        exponent >>= 1
+        if exponent > 0:
+            value = mult(value, value)
+    return one if res is None else res
+
+def float_value(value: 'Value') -> 'Union[float, complex]':
+    if isinstance(value, Rational):
+        return float(value)
+    if isinstance(value, Complex):
+        return complex(value)
+    raise ConversionError(value, float)
+
+# Decimal display of numbers: integers as they are, other values with at
+# most 6 decimals (Rationals, and the floats of the float backend)
+def decimal_str(value: 'float') -> 'str':
+    if value.is_integer():
+        return str(int(value))
+    return f"{value:.6f}".rstrip('0').rstrip('.')
+
+
+def _immutable_setattr(self, name: 'str', value) -> None:
+    raise AttributeError(f"'{type(self).__name__}' object is immutable")
+
+
+# Rational and Complex are immutable values: instances are never copied
+# and the common constants are shared singletons
 @functools.total_ordering
 class Rational:
+    __slots__ = ('num', 'denum')
+
     def __init__(self, num: 'int', denum: 'int' = 1):
         num, denum = reduce_fraction(num, denum)
-        self.num = num
-        self.denum = denum
+        object.__setattr__(self, 'num', num)
+        object.__setattr__(self, 'denum', denum)
+
+    __setattr__ = _immutable_setattr
+    __delattr__ = _immutable_setattr
+
+    def __reduce__(self):
+        return (Rational, (self.num, self.denum))
+
+    def __copy__(self) -> 'Rational':
+        return self
+
+    def __deepcopy__(self, memo: 'dict') -> 'Rational':
+        return self
 
     @classmethod
     def zero(cl) -> 'Rational':
-        return Rational(0)
+        return RATIONAL_ZERO
 
     @classmethod
     def one(cl) -> 'Rational':
-        return Rational(1)
+        return RATIONAL_ONE
+
+    @classmethod
+    def minus_one(cl) -> 'Rational':
+        return RATIONAL_MINUS_ONE
+
+    # Scalars computed in floats (float backend) come back into the language
+    # as Rationals, from the shortest decimal writing of the float
+    @classmethod
+    def from_float(cl, value: 'float') -> 'Rational':
+        if not isfinite(value):
+            raise NotANumberError(value)
+        f = Fraction(repr(float(value)))
+        return Rational(f.numerator, f.denominator)
+
+    @classmethod
+    def _reduced(cl, num: 'int', denum: 'int') -> 'Rational':
+        # num / denum must already be irreducible with denum > 0
+        res = object.__new__(Rational)
+        object.__setattr__(res, 'num', num)
+        object.__setattr__(res, 'denum', denum)
+        return res
 
     def __add__(self, other) -> 'Scalar':
         if isinstance(other, Complex) or isinstance(other, Matrix):
             return other + self
         if isinstance(other, int):
-            other = Rational(other)
-        new_denum = ppcm(self.denum, other.denum)
-        return Rational(self.num * new_denum // self.denum + other.num * new_denum // other.denum, new_denum)
+            other = Rational._reduced(other, 1)
+        d1, d2 = self.denum, other.denum
+        if d1 == 1 and d2 == 1:
+            return Rational._reduced(self.num + other.num, 1)
+        if d1 == d2:
+            return Rational(self.num + other.num, d1)
+        g = gcd(d1, d2)
+        return Rational(self.num * (d2 // g) + other.num * (d1 // g), d1 // g * d2)
 
     def __neg__(self) -> 'Rational':
-        return Rational(-self.num, self.denum)
+        return Rational._reduced(-self.num, self.denum)
 
     def __sub__(self, other: 'Scalar') -> 'Scalar':
         if isinstance(other, Complex):
             return other.__rsub__(self)
         return self + (-other)
 
+    @classmethod
+    def _product(cl, n1: 'int', d1: 'int', n2: 'int', d2: 'int') -> 'Rational':
+        # (n1 / d1) * (n2 / d2) with both fractions irreducible and d1, d2 > 0:
+        # cross-cancelling keeps the result irreducible
+        if d1 == 1 and d2 == 1:
+            return Rational._reduced(n1 * n2, 1)
+        if n1 == 0 or n2 == 0:
+            return RATIONAL_ZERO
+        g1 = gcd(n1, d2)
+        g2 = gcd(n2, d1)
+        return Rational._reduced((n1 // g1) * (n2 // g2), (d1 // g2) * (d2 // g1))
+
     def __mul__(self, other: 'Scalar') -> 'Scalar':
         if isinstance(other, Complex) or isinstance(other, Matrix):
             return other * self
         if isinstance(other, int):
-            other = Rational(other)
-        return Rational(self.num * other.num, self.denum * other.denum)
+            other = Rational._reduced(other, 1)
+        if other is self:
+            # The square of an irreducible fraction is irreducible
+            return Rational._reduced(self.num * self.num, self.denum * self.denum)
+        return Rational._product(self.num, self.denum, other.num, other.denum)
 
     def __truediv__(self, other: 'Scalar') -> 'Scalar':
         if other == 0:
@@ -72,8 +160,10 @@ class Rational:
         if isinstance(other, Complex) or isinstance(other, Matrix):
             return other.__rtruediv__(self)
         if isinstance(other, int):
-            other = Rational(other)
-        return Rational(self.num * other.denum, self.denum * other.num)
+            other = Rational._reduced(other, 1)
+        if other.num < 0:
+            return Rational._product(self.num, self.denum, -other.denum, -other.num)
+        return Rational._product(self.num, self.denum, other.denum, other.num)
 
     def __mod__(self, other: 'Rational') -> 'Rational':
         if isinstance(other, Complex) or isinstance(other, Matrix):
@@ -95,6 +185,10 @@ class Rational:
             assert(isinstance(other, int))
             return self.denum == 1 and self.num == other
 
+    def __hash__(self) -> 'int':
+        # Consistent with equality to ints
+        return hash(self.num) if self.denum == 1 else hash((self.num, self.denum))
+
     def __gt__(self, other: 'Rational') -> 'bool':
         if isinstance(other, int):
             other = Rational(other)
@@ -109,7 +203,7 @@ class Rational:
         return self + other
 
     def __rsub__(self, other: 'Scalar') -> 'Scalar':
-        return self - other
+        return (-self) + other
 
     def __rmul__(self, other: 'Scalar') -> 'Scalar':
         return self * other
@@ -140,28 +234,42 @@ class Rational:
     def __str__(self) -> 'str':
         if self.denum == 1:
             return str(self.num)
-        return f"{self.num / self.denum:.6f}".rstrip('0').rstrip('.')
+        return decimal_str(self.num / self.denum)
 
     def __repr__(self) -> str:
         return self.__str__()
 
 
 class Complex:
+    __slots__ = ('re', 'im')
+
     def __init__(self, re: 'RationalOrInt', im: 'RationalOrInt' = 0):
-        self.re = re if isinstance(re, Rational) else Rational(re)
-        self.im = im if isinstance(im, Rational) else Rational(im)
+        object.__setattr__(self, 're', re if isinstance(re, Rational) else Rational(re))
+        object.__setattr__(self, 'im', im if isinstance(im, Rational) else Rational(im))
+
+    __setattr__ = _immutable_setattr
+    __delattr__ = _immutable_setattr
+
+    def __reduce__(self):
+        return (Complex, (self.re, self.im))
+
+    def __copy__(self) -> 'Complex':
+        return self
+
+    def __deepcopy__(self, memo: 'dict') -> 'Complex':
+        return self
 
     @classmethod
     def zero(cl) -> 'Complex':
-        return Complex(0, 0)
+        return COMPLEX_ZERO
 
     @classmethod
     def one(cl) -> 'Complex':
-        return Complex(1, 0)
+        return COMPLEX_ONE
 
     @classmethod
     def i(cl) -> 'Complex':
-        return Complex(0, 1)
+        return COMPLEX_I
 
     @classmethod
     def from_any_value(cl, val: 'ScalarOrInt') -> 'Complex':
@@ -201,6 +309,8 @@ class Complex:
     def __truediv__(self, other: 'ScalarOrInt') -> 'Scalar':
         if other == 0:
             raise DivisionByZeroError()
+        if isinstance(other, Matrix):
+            return other.__rtruediv__(self)
         other = Complex.from_any_value(other)
         return self * other._inverse()
 
@@ -212,11 +322,15 @@ class Complex:
         other = Complex.from_any_value(other)
         return self.re == other.re and self.im == other.im
 
+    def __hash__(self) -> 'int':
+        # Consistent with equality to Rationals
+        return hash(self.re) if self.im == 0 else hash((self.re, self.im))
+
     def __radd__(self, other: 'ScalarOrInt') -> 'Scalar':
         return self + other
 
     def __rsub__(self, other: 'ScalarOrInt') -> 'Scalar':
-        return self - other
+        return (-self) + other
 
     def __rmul__(self, other: 'ScalarOrInt') -> 'Scalar':
         return self * other
@@ -232,6 +346,9 @@ class Complex:
             other = Rational(other)
         return other ** self
 
+    def __complex__(self) -> 'complex':
+        return complex(float(self.re), float(self.im))
+
     @classmethod
     def _imginary_part_str(cl, im: 'Rational'):
         if im == 1:
@@ -255,24 +372,228 @@ class Complex:
         return self.__str__()
 
 
+RATIONAL_ZERO = Rational(0)
+RATIONAL_ONE = Rational(1)
+RATIONAL_MINUS_ONE = Rational(-1)
+COMPLEX_ZERO = Complex(RATIONAL_ZERO, RATIONAL_ZERO)
+COMPLEX_ONE = Complex(RATIONAL_ONE, RATIONAL_ZERO)
+COMPLEX_I = Complex(RATIONAL_ZERO, RATIONAL_ONE)
+
+
+def dot(values1: 'List[Scalar]', values2: 'List[Scalar]') -> 'Scalar':
+    if not all(isinstance(v, Rational) for v in values1) \
+            or not all(isinstance(v, Rational) for v in values2):
+        return sum((v1 * v2 for v1, v2 in zip(values1, values2)), start=Rational.zero())
+    # Exact sum accumulated over a common denominator, reduced only once
+    num, denum = 0, 1
+    for v1, v2 in zip(values1, values2):
+        n, d = v1.num * v2.num, v1.denum * v2.denum
+        if d == denum:
+            num += n
+        elif denum % d == 0:
+            num += n * (denum // d)
+        else:
+            g = gcd(denum, d)
+            num = num * (d // g) + n * (denum // g)
+            denum = denum // g * d
+    return Rational(num, denum)
+
+
+# Integers as a compact 'q' typed array, or as a list if one of them
+# doesn't fit in 64 bits
+def _int_array(values: 'Iterable[int]') -> 'Union[array, List[int]]':
+    values = list(values)
+    try:
+        return array('q', values)
+    except OverflowError:
+        return values
+
+
+# Common denominator of fractions (num, denum), and their numerators
+# scaled to it
+def _scaled_ints(nums: 'Sequence[int]', denums: 'Sequence[int]') -> 'Tuple[List[int], int]':
+    denum = 1
+    for d in denums:
+        if denum % d != 0:
+            denum = denum // gcd(denum, d) * d
+    return [n * (denum // d) for n, d in zip(nums, denums)], denum
+
+
+# Sum of two irreducible fractions, reduced (the gcd is taken with the
+# gcd of the denominators only)
+def _fraction_sum(n1: 'int', d1: 'int', n2: 'int', d2: 'int') -> 'Tuple[int, int]':
+    if d1 == d2:
+        n = n1 + n2
+        if d1 == 1:
+            return n, 1
+        g = gcd(n, d1)
+        return n // g, d1 // g
+    g = gcd(d1, d2)
+    n = n1 * (d2 // g) + n2 * (d1 // g)
+    if n == 0:
+        return 0, 1
+    g2 = gcd(n, g)
+    return n // g2, (d1 // g) * (d2 // g2)
+
+
+def _fraction_product(n1: 'int', d1: 'int', n2: 'int', d2: 'int') -> 'Tuple[int, int]':
+    if d1 == 1 and d2 == 1:
+        return n1 * n2, 1
+    if n1 == 0 or n2 == 0:
+        return 0, 1
+    g1 = gcd(n1, d2)
+    g2 = gcd(n2, d1)
+    return (n1 // g1) * (n2 // g2), (d1 // g2) * (d2 // g1)
+
+
+# Matrices are stored flat, in row-major order, with (row, column) strides:
+# element (i, j) is at index i * strides[0] + j * strides[1], so that the
+# transpose is a view on the same storage. Depending on the elements:
+# - EXACT: Rationals, as numerator and denominator int arrays,
+# - FLOAT: float64 values in a NumPy array (opt-in float backend, products
+#   are computed by BLAS),
+# - OBJECT: any other elements (Complexes, or Exprs for matrix literals).
+# 'data' gives the elements as nested lists.
 class Matrix:
+    EXACT = "EXACT"
+    FLOAT = "FLOAT"
+    OBJECT = "OBJECT"
+
+    float_backend = False
+    # Columns of the right operand processed at once by the exact kernel
+    MATMULT_BLOCK = 64
+
+    @classmethod
+    def set_float_backend(cl, enabled: 'bool') -> 'bool':
+        Matrix.float_backend = enabled and np is not None
+        return Matrix.float_backend
+
     @classmethod
     def shape_is_valid(cl, data: 'List[List]') -> 'bool':
         return len(set(len(line) for line in data)) == 1
 
+    # data: nested lists of elements, or a 2D NumPy array of floats
     def __init__(self, data: 'List[List]', skip_verif: 'bool' = False):
+        if np is not None and isinstance(data, np.ndarray):
+            self._init_float(data)
+            return
         if not skip_verif and not Matrix.shape_is_valid(data):
             msg = "All lines in matrix must be of the same size\n"
             msg += f"Matrix is:\n{Matrix.str_from_data(data)}\n"
             msg += f"Sizes of lines {[len(line) for line in data]}"
             raise Exception(msg)
-        self.data = data
-        self.h = len(data)
-        self.w = len(data[0])
+        self._init_flat(len(data), len(data[0]), [v for row in data for v in row])
+
+    def _init_flat(self, h: 'int', w: 'int', values: 'List') -> None:
+        self.h, self.w = h, w
+        self.strides = (w, 1)
+        if all(isinstance(v, Rational) for v in values):
+            self.kind = Matrix.EXACT
+            self.num = _int_array(v.num for v in values)
+            self.denum = _int_array(v.denum for v in values)
+        else:
+            self.kind = Matrix.OBJECT
+            self.values = values
+
+    # Complex results of the float backend (products with i, or by a matrix
+    # of Complexes) are brought back to Complexes, in an OBJECT matrix
+    def _init_float(self, array: 'np.ndarray') -> None:
+        if np.iscomplexobj(array):
+            if np.any(array.imag != 0):
+                h, w = array.shape
+                values = [Complex.scalar_from_re_im(Rational.from_float(z.real), Rational.from_float(z.imag))
+                          for z in array.ravel().tolist()]
+                self._init_flat(h, w, values)
+                return
+            array = array.real
+        self.kind = Matrix.FLOAT
+        self.h, self.w = array.shape
+        self.strides = (self.w, 1)
+        self.array = array
+
+    @classmethod
+    def from_values(cl, h: 'int', w: 'int', values: 'List') -> 'Matrix':
+        res = object.__new__(Matrix)
+        res._init_flat(h, w, values)
+        return res
+
+    @classmethod
+    def _exact(cl, h: 'int', w: 'int', nums: 'Iterable[int]', denums: 'Iterable[int]') -> 'Matrix':
+        res = object.__new__(Matrix)
+        res.kind = Matrix.EXACT
+        res.h, res.w = h, w
+        res.strides = (w, 1)
+        res.num = _int_array(nums)
+        res.denum = _int_array(denums)
+        return res
 
+    @classmethod
+    def identity(cl, n: 'int') -> 'Matrix':
+        return Matrix._exact(n, n, (int(i == j) for i in range(n) for j in range(n)), [1] * (n * n))
+
+    @property
+    def shape(self) -> 'Tuple[int, int]':
+        return self.h, self.w
+
+    def is_float(self) -> 'bool':
+        return self.kind == Matrix.FLOAT
+
+    # Storage in logical row-major order (returned as is when contiguous)
+    def _flat(self, storage: 'Sequence') -> 'Sequence':
+        if self.strides == (self.w, 1):
+            return storage
+        s0, s1 = self.strides
+        return [storage[i * s0 + j * s1] for i in range(self.h) for j in range(self.w)]
+
+    def flat_values(self) -> 'List':
+        if self.kind == Matrix.EXACT:
+            return [Rational._reduced(n, d) for n, d in zip(self._flat(self.num), self._flat(self.denum))]
+        if self.kind == Matrix.FLOAT:
+            return self.array.ravel().tolist()
+        return list(self._flat(self.values))
+
+    @property
+    def data(self) -> 'List[List]':
+        values = self.flat_values()
+        return [values[i * self.w:(i + 1) * self.w] for i in range(self.h)]
+
+    def __getitem__(self, index: 'Tuple[int, int]'):
+        i, j = index
+        if self.kind == Matrix.FLOAT:
+            return float(self.array[i, j])
+        k = i * self.strides[0] + j * self.strides[1]
+        if self.kind == Matrix.EXACT:
+            return Rational._reduced(self.num[k], self.denum[k])
+        return self.values[k]
+
+    def _view(self, h: 'int', w: 'int', strides: 'Tuple[int, int]') -> 'Matrix':
+        res = object.__new__(Matrix)
+        res.__dict__.update(self.__dict__)
+        res.h, res.w, res.strides = h, w, strides
+        return res
+
+    # View sharing the storage
     def T(self) -> 'Matrix':
-        dataT = [[self.data[j][i] for j in range(self.h)] for i in range(self.w)]
-        return Matrix(dataT, skip_verif=True)
+        if self.kind == Matrix.FLOAT:
+            return Matrix(self.array.T)
+        return self._view(self.w, self.h, self.strides[::-1])
+
+    # Slice of a flat storage along a row (axis 0) or a column (axis 1)
+    def _line(self, storage: 'Sequence', axis: 'int', k: 'int') -> 'Sequence':
+        s0, s1 = self.strides
+        if axis == 0:
+            start, step, length = k * s0, s1, self.w
+        else:
+            start, step, length = k * s1, s0, self.h
+        return storage[start:start + (length - 1) * step + 1:step]
+
+    def float_array(self) -> 'np.ndarray':
+        if self.kind == Matrix.FLOAT:
+            return self.array
+        if self.kind == Matrix.EXACT:
+            nums = np.array(self._flat(self.num), dtype=float)
+            return (nums / np.array(self._flat(self.denum), dtype=float)).reshape(self.h, self.w)
+        return np.array([float_value(v) for v in self.flat_values()]).reshape(self.h, self.w)
 
     @classmethod
     def verify_same_shape(cl, m1: 'Matrix', m2: 'Matrix', op_name: 'str'):
@@ -287,58 +608,141 @@ class Matrix:
     @classmethod
     def matmult(cl, m1: 'Matrix', m2: 'Matrix') -> 'Matrix':
         Matrix.verify_can_mult(m1, m2)
-        res = []
-        for row1 in m1.data:
-            res_row = []
-            for col2 in m2.T().data:
-                res_row.append(sum((v1 * v2 for v1, v2 in zip(row1, col2)), start=Rational.zero()))
-            res.append(res_row)
-        return Matrix(res, skip_verif=True)
+        if Matrix.float_backend or m1.is_float() or m2.is_float():
+            return Matrix(m1.float_array() @ m2.float_array())
+        if m1.kind == Matrix.EXACT and m2.kind == Matrix.EXACT:
+            return Matrix._matmult_exact(m1, m2)
+        rows = m1.data
+        cols = m2.T().data
+        return Matrix([[dot(row, col) for col in cols] for row in rows], skip_verif=True)
+
+    # Each row and column is put over a common denominator once, so that
+    # every entry is an integer dot product with a single reduction. The
+    # columns are processed by blocks, reused by every row while hot
+    @classmethod
+    def _matmult_exact(cl, m1: 'Matrix', m2: 'Matrix') -> 'Matrix':
+        rows = [_scaled_ints(m1._line(m1.num, 0, i), m1._line(m1.denum, 0, i)) for i in range(m1.h)]
+        cols = [_scaled_ints(m2._line(m2.num, 1, j), m2._line(m2.denum, 1, j)) for j in range(m2.w)]
+        h, w = m1.h, m2.w
+        nums, denums = [0] * (h * w), [1] * (h * w)
+        mul = operator.mul
+        for j0 in range(0, w, Matrix.MATMULT_BLOCK):
+            block = cols[j0:j0 + Matrix.MATMULT_BLOCK]
+            for i, (row, d) in enumerate(rows):
+                for j, (col, e) in enumerate(block, i * w + j0):
+                    n, de = sum(map(mul, row, col)), d * e
+                    g = gcd(n, de)
+                    nums[j], denums[j] = n // g, de // g
+        return Matrix._exact(h, w, nums, denums)
+
+    # On exact matrices, + - * run on the numerators and denominators
+    # without building Rationals
+    @classmethod
+    def _exact_elementwise(cl, op: 'Callable', m1: 'Matrix', m2: 'Matrix') -> 'Matrix':
+        nums, denums = [], []
+        for n1, d1, n2, d2 in zip(m1._flat(m1.num), m1._flat(m1.denum), m2._flat(m2.num), m2._flat(m2.denum)):
+            n, d = op(n1, d1, n2, d2)
+            nums.append(n)
+            denums.append(d)
+        return Matrix._exact(m1.h, m1.w, nums, denums)
 
+    @classmethod
+    def _exact_scalar(cl, op: 'Callable', m: 'Matrix', n2: 'int', d2: 'int') -> 'Matrix':
+        nums, denums = [], []
+        for n1, d1 in zip(m._flat(m.num), m._flat(m.denum)):
+            n, d = op(n1, d1, n2, d2)
+            nums.append(n)
+            denums.append(d)
+        return Matrix._exact(m.h, m.w, nums, denums)
+
+    # On float matrices, the operation runs once on the whole arrays
     @classmethod
     def elementwise_operation(cl, operation: 'Callable', m1: 'Matrix', m2: 'Matrix') -> 'Matrix':
-        return Matrix([[operation(el1, el2) for el1, el2 in zip(row1, row2)] for row1, row2 in zip(m1.data, m2.data)])
+        if m1.is_float() or m2.is_float():
+            return Matrix(operation(m1.float_array(), m2.float_array()))
+        values = [operation(el1, el2) for el1, el2 in zip(m1.flat_values(), m2.flat_values())]
+        return Matrix.from_values(m1.h, m1.w, values)
 
     @classmethod
     def elementwise_unary_operation(cl, operation: 'Callable', m1: 'Matrix') -> 'Matrix':
-        return Matrix([[operation(el1) for el1 in row1] for row1 in m1.data])
+        if m1.is_float():
+            return Matrix(operation(m1.array))
+        return Matrix.from_values(m1.h, m1.w, [operation(el1) for el1 in m1.flat_values()])
 
     def __add__(self, other: 'Value') -> 'Matrix':
+        if self.is_float() and not isinstance(other, Matrix):
+            other = float_value(other)
         if isinstance(other, Matrix):
             Matrix.verify_same_shape(self, other, "addition")
+            if self.kind == Matrix.EXACT and other.kind == Matrix.EXACT:
+                return Matrix._exact_elementwise(_fraction_sum, self, other)
             return Matrix.elementwise_operation(lambda x, y: x + y, self, other)
         else:
+            if self.kind == Matrix.EXACT and isinstance(other, (int, Rational)):
+                other = Rational(other) if isinstance(other, int) else other
+                return Matrix._exact_scalar(_fraction_sum, self, other.num, other.denum)
             return Matrix.elementwise_unary_operation(lambda x: x + other, self)
 
     def __neg__(self) -> 'Matrix':
+        if self.kind == Matrix.EXACT:
+            return Matrix._exact(self.h, self.w, (-n for n in self._flat(self.num)), self._flat(self.denum))
         return Matrix.elementwise_unary_operation(lambda x: -x, self)
 
     def __sub__(self, other: 'Value') -> 'Matrix':
+        if self.is_float() and not isinstance(other, Matrix):
+            other = float_value(other)
         if isinstance(other, Matrix):
             Matrix.verify_same_shape(self, other, "substraction")
+            if self.kind == Matrix.EXACT and other.kind == Matrix.EXACT:
+                return self + (-other)
             return Matrix.elementwise_operation(lambda x, y: x - y, self, other)
         else:
+            if self.kind == Matrix.EXACT and isinstance(other, (int, Rational)):
+                return self + (-other)
             return Matrix.elementwise_unary_operation(lambda x: x - other, self)
 
     def __mul__(self, other: 'Value') -> 'Matrix':
+        if self.is_float() and not isinstance(other, Matrix):
+            other = float_value(other)
         if isinstance(other, Matrix):
             Matrix.verify_same_shape(self, other, "multiplication")
+            if self.kind == Matrix.EXACT and other.kind == Matrix.EXACT:
+                return Matrix._exact_elementwise(_fraction_product, self, other)
             return Matrix.elementwise_operation(lambda x, y: x * y, self, other)
         else:
+            if self.kind == Matrix.EXACT and isinstance(other, (int, Rational)):
+                other = Rational(other) if isinstance(other, int) else other
+                return Matrix._exact_scalar(_fraction_product, self, other.num, other.denum)
             return Matrix.elementwise_unary_operation(lambda x: x * other, self)
 
+    # A / B is A ** inv(B) (matrix product)
     def __truediv__(self, other: 'Value') -> 'Matrix':
         if isinstance(other, Matrix):
-            raise MatrixDivisionOperatorError(self, other)
+            return Matrix.matmult(self, other.inv())
         else:
+            if self.is_float():
+                other = float_value(other)
+                if other == 0:
+                    raise DivisionByZeroError()
+            elif self.kind == Matrix.EXACT and isinstance(other, (int, Rational)):
+                if other == 0:
+                    raise DivisionByZeroError()
+                return self * (Rational.one() / other)
             return Matrix.elementwise_unary_operation(lambda x: x / other, self)
 
+    def __pow__(self, other: 'ScalarOrInt') -> 'Matrix':
+        exponent = exponent_check(other)
+        if self.h != self.w:
+            raise NonSquareMatrixError(self, "power")
+        if exponent < 0:
+            return power(self.inv(), -exponent, Matrix.identity(self.h), mult=Matrix.matmult)
+        return power(self, exponent, Matrix.identity(self.h), mult=Matrix.matmult)
+
     def __eq__(self, other: 'Value') -> 'bool':
         if isinstance(other, Matrix):
             Matrix.verify_same_shape(self, other, "equality")
-            return all(Matrix.elementwise_operation(lambda x, y: x == y, self, other).data)
-        else:
-            return Matrix.elementwise_unary_operation(lambda x: x / other, self)
+            return all(v1 == v2 for v1, v2 in zip(self.flat_values(), other.flat_values()))
+        return False
 
     def __radd__(self, other: 'Value') -> 'Matrix':
         return self + other
@@ -349,14 +753,78 @@ class Matrix:
     def __rmul__(self, other: 'Value') -> 'Matrix':
         return self * other
 
+    def __rtruediv__(self, other: 'Value') -> 'Matrix':
+        return self.inv() * other
+
     def __req__(self, other: 'Value') -> 'bool':
         return self == other
 
+    # Linear algebra. Exact matrices go through Bareiss elimination, on
+    # integer rows (each row of the system is scaled by the common
+    # denominator of its entries, which doesn't change the solutions),
+    # float matrices through NumPy and other ones (Complexes) through
+    # Gaussian elimination
+    def verify_square(self, op_name: 'str'):
+        if self.h != self.w:
+            raise NonSquareMatrixError(self, op_name)
+
+    def _scaled_row(self, i: 'int') -> 'Tuple[List[int], int]':
+        return _scaled_ints(self._line(self.num, 0, i), self._line(self.denum, 0, i))
+
+    def det(self) -> 'Scalar':
+        self.verify_square("determinant")
+        if self.is_float():
+            return Rational.from_float(np.linalg.det(self.array))
+        if self.kind == Matrix.EXACT:
+            rows, scale = [], 1
+            for i in range(self.h):
+                row, d = self._scaled_row(i)
+                rows.append(row)
+                scale *= d
+            return Rational(bareiss(rows, self.h), scale)
+        solved = gauss_solve(self.data, self.h)
+        return Rational.zero() if solved is None else solved[1]
+
+    def inv(self) -> 'Matrix':
+        self.verify_square("inverse")
+        return self.solve(Matrix.identity(self.h))
+
+    # Solution X of self ** X = b, for a square self
+    def solve(self, b: 'Matrix') -> 'Matrix':
+        self.verify_square("system solving")
+        if b.h != self.h:
+            raise IncompatibleMatrixShapeError(self, b, "system solving")
+        if self.is_float() or b.is_float():
+            try:
+                return Matrix(np.linalg.solve(self.float_array(), b.float_array()))
+            except np.linalg.LinAlgError:
+                raise SingularMatrixError(self)
+        if self.kind == Matrix.EXACT and b.kind == Matrix.EXACT:
+            rows = []
+            for i in range(self.h):
+                (row, d), (rhs, e) = self._scaled_row(i), b._scaled_row(i)
+                g = gcd(d, e)
+                rows.append([v * (e // g) for v in row] + [v * (d // g) for v in rhs])
+            solved = bareiss_solve(rows, self.h)
+            if solved is None:
+                raise SingularMatrixError(self)
+            columns, d = solved
+            fractions = [reduce_fraction(columns[j][i], d) for i in range(b.h) for j in range(b.w)]
+            return Matrix._exact(b.h, b.w, (n for n, _ in fractions), (d for _, d in fractions))
+        rows = [a_row + b_row for a_row, b_row in zip(self.data, b.data)]
+        solved = gauss_solve(rows, self.h)
+        if solved is None:
+            raise SingularMatrixError(self)
+        columns, _ = solved
+        return Matrix.from_values(b.h, b.w, [columns[j][i] for i in range(b.h) for j in range(b.w)])
+
     @classmethod
     def str_from_data(cl, data: 'List[List]') -> 'str':
         return "\n".join("[" + ",".join(f" {l} " for l in line) + "]" for line in data)
 
     def __str__(self) -> 'str':
+        if self.kind == Matrix.FLOAT:
+            return Matrix.str_from_data([[decimal_str(v) for v in line] for line in self.data])
         return Matrix.str_from_data(self.data)
 
 
@@ -0,0 +1,136 @@
+from typing import List, Tuple, Union
+
+from .expressions import Literal, Term, Expr
+from .math_types import Rational, Complex
+from ..parsing.tokenizing import Token
+from ..utils.python_types import Factor, Scalar
+from ..utils.scope import Scope
+from ..utils.errors import Error
+
+# Simplification pass run on function bodies before they are stored:
+# - constant subtrees are folded into NUMBER literals,
+# - the scalar constants of a product are gathered in one coefficient,
+#   placed in front of the term (multiplications by 1 disappear),
+# - like terms are merged and constant terms summed (additions of 0
+#   disappear).
+# Only scalars are moved around, so products of matrices keep their order.
+# A chain is a base with its exponents: x ^ 2 ^ y
+
+Chain = 'Tuple[int, List[Factor]]'
+
+
+def is_constant(node: 'Factor') -> 'bool':
+    if isinstance(node, Literal):
+        return node.type == Literal.NUMBER
+    if isinstance(node, Term):
+        return all(is_constant(f) for f in [node.factor_first, *node.factors])
+    return all(is_constant(t) for t in node.terms)
+
+
+def _number(value: 'Scalar') -> 'Literal':
+    return Literal(Literal.NUMBER, value)
+
+
+def _is_scalar(value) -> 'bool':
+    return isinstance(value, (Rational, Complex))
+
+
+# Folds a constant node into a NUMBER literal (left as is if its evaluation
+# fails, so that the error shows up when the function is called)
+def _folded(node: 'Factor') -> 'Factor':
+    if isinstance(node, Literal):
+        return node
+    if is_constant(node):
+        try:
+            return _number(node.evaluate(Scope()))
+        except Error:
+            return node
+    if isinstance(node, Expr):
+        node = optimize(node)
+        if len(node.terms) == 1 and node.terms[0].is_single_factor():
+            return node.terms[0].factor_first
+    return node
+
+
+def _chains(term: 'Term') -> 'List[Chain]':
+    chains = [(Token.MULT, [term.factor_first])]
+    for op, factor in zip(term.operations, term.factors):
+        if op == Token.POW:
+            chains[-1][1].append(factor)
+        else:
+            chains.append((op, [factor]))
+    return chains
+
+
+def _chain_term(chain: 'List[Factor]') -> 'Term':
+    t = Term(chain[0])
+    for factor in chain[1:]:
+        t.push_back(Token.POW, factor)
+    return t
+
+
+# Splits a term in a scalar coefficient (sign included) and the chains
+# left, or returns None if the term can't be reordered
+def _split(term: 'Term') -> 'Union[Tuple[Scalar, List[Chain]], None]':
+    if not all(op in (Token.MULT, Token.DIV, Token.POW) for op in term.operations):
+        return None
+    coef = Rational.one() if term.sign == Token.PLUS else Rational.minus_one()
+    chains = []
+    try:
+        for op, chain in _chains(term.mapped_term(_folded)):
+            if all(is_constant(f) for f in chain):
+                value = _chain_term(chain).evaluate(Scope())
+                if _is_scalar(value):
+                    coef = coef * value if op == Token.MULT else coef / value
+                    continue
+            chains.append((op, chain))
+    except Error:
+        return None
+    return coef, chains
+
+
+def _build_term(coef: 'Scalar', chains: 'List[Chain]') -> 'Term':
+    sign = Token.PLUS
+    if isinstance(coef, Rational) and not coef >= 0:
+        sign, coef = Token.MINUS, -coef
+    if len(chains) == 0:
+        return Term(_number(coef), sign)
+    # A leading division needs a numerator
+    if coef == 1 and chains[0][0] == Token.MULT:
+        t = Term(chains[0][1][0], sign)
+        for factor in chains[0][1][1:]:
+            t.push_back(Token.POW, factor)
+        chains = chains[1:]
+    else:
+        t = Term(_number(coef), sign)
+    for op, chain in chains:
+        t.push_back(op, chain[0])
+        for factor in chain[1:]:
+            t.push_back(Token.POW, factor)
+    return t
+
+
+def optimize(expr: 'Expr') -> 'Expr':
+    # variable part (as a string) -> [coef, chains], in order of appearance
+    merged = {}
+    others = []
+    constant = Rational.zero()
+    for term in expr.terms:
+        split = _split(term)
+        if split is None:
+            others.append(term.mapped_term(_folded))
+            continue
+        coef, chains = split
+        if len(chains) == 0:
+            constant = constant + coef
+            continue
+        key = str(_build_term(Rational.one(), chains))
+        if key in merged:
+            merged[key][0] = merged[key][0] + coef
+        else:
+            merged[key] = [coef, chains]
+    terms = [_build_term(coef, chains) for coef, chains in merged.values()]
+    terms.extend(others)
+    if not constant == 0 or len(terms) == 0:
+        terms.append(_build_term(constant, []))
+    return Expr(terms)
@@ -1,16 +1,72 @@
 
 from copy import deepcopy
-from typing import Dict
-from collections import defaultdict
-from math import sqrt
+from fractions import Fraction
+from typing import Dict, List, Iterable, Tuple, Union
+from math import sqrt, gcd, isqrt
 
-from .math_types import Rational, exponent_check, power
-from ..utils.python_types import Scalar
-from ..utils.errors import NotANumberError
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
+from .math_types import Rational, Complex, Matrix, exponent_check, power, float_value, \
+                        decimal_str
+from ..utils.python_types import Scalar, RationalOrInt
+from ..utils.errors import NotANumberError, NonPolynomialEquation, NonSquareMatrixError
+from ..utils.root_finding import find_roots, split_rational_roots, DEFAULT_TOLERANCE
+from ..utils.math_utils import KARATSUBA_THRESHOLD, FFT_THRESHOLD, convolve_karatsuba, \
+                               convolve_fft, add_lists
+
+# Coefficients are stored either sparse, in a dict {power: coef} without
+# zeros, or dense, in a list indexed by power without trailing zeros.
+# The dense list is picked when most coefficients up to the degree are
+# non zero, and allows Karatsuba / FFT products on large degrees.
 class Poly:
+    DENSE_MIN_DEGREE = 16
+    DENSE_MIN_FILL = 0.5
+
     def __init__(self, d: 'Dict[int, Scalar]' = dict()) -> None:
-        self.d = {i: v for i, v in d.items() if not (v == 0)}
+        d = {i: v for i, v in d.items() if not (v == 0)}
+        degree = max(d.keys(), default=-1)
+        if degree >= Poly.DENSE_MIN_DEGREE and len(d) >= Poly.DENSE_MIN_FILL * (degree + 1):
+            zero = Poly._zero_like(d.values())
+            self._d = None
+            self._coefs = [d.get(i, zero) for i in range(degree + 1)]
+        else:
+            self._d = d
+            self._coefs = None
+        self._horner = None
+
+    @classmethod
+    def from_coefs(cl, coefs: 'List[Scalar]') -> 'Poly':
+        while len(coefs) > 0 and coefs[-1] == 0:
+            coefs.pop()
+        if len(coefs) <= Poly.DENSE_MIN_DEGREE:
+            return Poly(dict(enumerate(coefs)))
+        poly = Poly()
+        poly._d = None
+        poly._coefs = coefs
+        return poly
+
+    @classmethod
+    def _zero_like(cl, values: 'Iterable[Scalar]') -> 'Scalar':
+        return 0.0 if all(type(v) is float for v in values) else Rational.zero()
+
+    @property
+    def d(self) -> 'Dict[int, Scalar]':
+        if self._d is None:
+            self._d = {i: v for i, v in enumerate(self._coefs) if not (v == 0)}
+        return self._d
+
+    @property
+    def coefs(self) -> 'List[Scalar]':
+        if self._coefs is None:
+            zero = Poly._zero_like(self._d.values())
+            self._coefs = [self._d.get(i, zero) for i in range(self.degree() + 1)]
+        return self._coefs
+
+    def is_dense(self) -> 'bool':
+        return self._coefs is not None
 
     @classmethod
     def zero(cl):
@@ -18,28 +74,67 @@ class Poly:
 
     @classmethod
     def one(cl):
-        return Poly({0: 1})
+        return Poly({0: Rational.one()})
 
     @classmethod
     def x(cl):
-        return Poly({1: 1})
+        return Poly({1: Rational.one()})
 
     def to_scalar(self):
-        if len(self.d) > 1 or 0 not in self.d:
+        if self.degree() > 0:
             raise NotANumberError(self)
-        return Rational.zero() if 0 not in self.d else self.d[0]
+        return self.d.get(0, Rational.zero())
 
     def __add__(self, other: 'Poly') -> 'Poly':
-        d = defaultdict(Rational.zero)
-        for i, v in [*self.d.items(), *other.d.items()]:
-            d[i] = d[i] + v
+        if self.is_dense() and other.is_dense():
+            return Poly.from_coefs(add_lists(self._coefs, other._coefs))
+        d = dict(self.d)
+        for i, v in other.d.items():
+            d[i] = d[i] + v if i in d else v
         return Poly(d)
 
+    @classmethod
+    def _dense_product(cl, a: 'List[Scalar]', b: 'List[Scalar]') -> 'Poly':
+        if all(type(v) in (float, complex) for v in (*a, *b)):
+            if min(len(a), len(b)) >= FFT_THRESHOLD:
+                return Poly.from_coefs(convolve_fft(a, b))
+            return Poly.from_coefs(convolve_karatsuba(a, b, 0.0))
+        if all(isinstance(v, (int, Rational)) for v in (*a, *b)):
+            # Karatsuba on integers: denominators are put aside
+            denum_a, denum_b = Poly._common_denum(a), Poly._common_denum(b)
+            ints_a = [Poly._scaled_num(v, denum_a) for v in a]
+            ints_b = [Poly._scaled_num(v, denum_b) for v in b]
+            denum = denum_a * denum_b
+            ints = convolve_karatsuba(ints_a, ints_b, 0)
+            return Poly.from_coefs([Rational(v, denum) for v in ints])
+        return Poly.from_coefs(convolve_karatsuba(a, b, Rational.zero()))
+
+    @classmethod
+    def _common_denum(cl, values: 'List[RationalOrInt]') -> 'int':
+        denum = 1
+        for v in values:
+            if isinstance(v, Rational) and denum % v.denum != 0:
+                denum = denum // gcd(denum, v.denum) * v.denum
+        return denum
+
+    @classmethod
+    def _scaled_num(cl, value: 'RationalOrInt', denum: 'int') -> 'int':
+        if isinstance(value, int):
+            return value * denum
+        return value.num * (denum // value.denum)
+
     def __mul__(self, other: 'Poly') -> 'Poly':
-        d = defaultdict(Rational.zero)
+        n1, n2 = len(self.d), len(other.d)
+        deg1, deg2 = self.degree(), other.degree()
+        # Dense products pay for the zeros, sparse ones for the dict accesses
+        if min(deg1, deg2) >= KARATSUBA_THRESHOLD \
+                and n1 * n2 >= Poly.DENSE_MIN_FILL * (deg1 + 1) * (deg2 + 1):
+            return Poly._dense_product(self.coefs, other.coefs)
+        d = {}
         for i, v1 in self.d.items():
             for j, v2 in other.d.items():
-                d[i + j] = d[i + j] + v1 * v2
+                k = i + j
+                d[k] = d[k] + v1 * v2 if k in d else v1 * v2
         return Poly(d)
 
     def __truediv__(self, other: 'Poly') -> 'Poly':
@@ -49,82 +144,235 @@ class Poly:
         return Poly(d)
 
     def __neg__(self):
+        if self.is_dense():
+            return Poly.from_coefs([-v for v in self._coefs])
         return Poly({i: -v for i, v in self.d.items()})
 
+    def __sub__(self, other: 'Poly') -> 'Poly':
+        return self + (-other)
+
+    def leading_coef(self) -> 'Scalar':
+        return self.d[self.degree()]
+
+    def derivative(self) -> 'Poly':
+        return Poly({i - 1: v * i for i, v in self.d.items() if i > 0})
+
+    def divmod(self, other: 'Poly') -> 'Tuple[Poly, Poly]':
+        # Euclidean division, exact on Rational / Complex coefficients
+        remainder = dict(self.d)
+        quotient = {}
+        deg_other, lead_other = other.degree(), other.leading_coef()
+        deg = self.degree()
+        while deg >= deg_other:
+            coef = remainder.get(deg, 0)
+            if not (coef == 0):
+                q = coef / lead_other
+                quotient[deg - deg_other] = q
+                for i, v in other.d.items():
+                    k = i + deg - deg_other
+                    remainder[k] = remainder[k] - q * v if k in remainder else -(q * v)
+            remainder.pop(deg, None)
+            deg -= 1
+        return Poly(quotient), Poly(remainder)
+
+    @classmethod
+    def gcd(cl, a: 'Poly', b: 'Poly') -> 'Poly':
+        # Monic greatest common divisor
+        while b.degree() >= 0:
+            a, b = b, a.divmod(b)[1]
+        return a / a.leading_coef() if a.degree() >= 0 else a
+
+    def squarefree_factors(self) -> 'List[Tuple[Poly, int]]':
+        # Yun's algorithm: self = lead * prod(factor ^ multiplicity),
+        # the factors being square free and coprime
+        factors = []
+        derivative = self.derivative()
+        a = Poly.gcd(self, derivative)
+        b = self.divmod(a)[0]
+        c = derivative.divmod(a)[0]
+        d = c - b.derivative()
+        multiplicity = 1
+        while b.degree() >= 1:
+            a = Poly.gcd(b, d)
+            if a.degree() >= 1:
+                factors.append((a, multiplicity))
+            b = b.divmod(a)[0]
+            c = d.divmod(a)[0]
+            d = c - b.derivative()
+            multiplicity += 1
+        return factors
+
+    def split_roots(self, tol: 'float' = DEFAULT_TOLERANCE) -> 'Tuple[List[Rational], List[complex]]':
+        # Exact rational roots and numeric other roots, with multiplicity.
+        # Multiple roots are badly conditioned, so they are first split off
+        # with exact arithmetic
+        if all(isinstance(v, (Rational, Complex)) for v in self.d.values()):
+            factors = self.squarefree_factors()
+        else:
+            factors = [(self, 1)]
+        exact_roots, roots = [], []
+        for factor, multiplicity in factors:
+            coefs = [factor.d.get(i, Rational.zero()) for i in range(factor.degree() + 1)]
+            if all(isinstance(c, Rational) for c in coefs):
+                rationals, others = split_rational_roots([Fraction(c.num, c.denum) for c in coefs], tol=tol)
+                exact_roots += [Rational(x.numerator, x.denominator) for x in rationals] * multiplicity
+            else:
+                others = find_roots([float_value(c) for c in coefs], tol=tol)
+            roots += others * multiplicity
+        return sorted(exact_roots, key=float_value), roots
+
+    def roots(self, tol: 'float' = DEFAULT_TOLERANCE) -> 'List[complex]':
+        # Numeric roots with multiplicity
+        exact_roots, roots = self.split_roots(tol)
+        roots += [complex(float_value(r)) for r in exact_roots]
+        return sorted(roots, key=lambda z: (z.imag != 0, z.real, z.imag))
+
     def __pow__(self, other: 'Poly') -> 'Poly':
         if isinstance(other, Poly):
             other = other.to_scalar()
         exponent = exponent_check(other)
-        assert(exponent >= 0)
+        if exponent < 0:
+            raise NonPolynomialEquation()
         return power(self, exponent, Poly.one())
 
+    # Horner's scheme, as a leading coefficient then (gap, coef) steps over
+    # the non zero coefficients: a run of zeros costs one power instead of
+    # one product per zero
+    def _horner_steps(self) -> 'Tuple[Scalar, List[Tuple[int, Scalar]], int]':
+        if self._horner is None:
+            powers = sorted(self.d.keys(), reverse=True)
+            if len(powers) == 0:
+                self._horner = (Rational.zero(), [], 0)
+            else:
+                steps = [(prev - p, self.d[p]) for prev, p in zip(powers, powers[1:])]
+                self._horner = (self.d[powers[0]], steps, powers[-1])
+        return self._horner
+
+    # On a square matrix A, the constant coefficient c stands for c * I and
+    # powers are matrix powers: p(A) = sum(c_k * A^k)
+    def __call__(self, value: 'Union[Scalar, Matrix]') -> 'Union[Scalar, Matrix]':
+        if isinstance(value, Matrix):
+            return self._matrix_call(value)
+        res, steps, last = self._horner_steps()
+        for gap, coef in steps:
+            res = res * (value if gap == 1 else value ** gap) + coef
+        if last > 0:
+            res = res * (value if last == 1 else value ** last)
+        return res
+
+    def _matrix_call(self, m: 'Matrix') -> 'Matrix':
+        if m.h != m.w:
+            raise NonSquareMatrixError(m, "polynomial evaluation")
+        identity = Matrix.identity(m.h)
+        lead, steps, last = self._horner_steps()
+        res = identity * lead
+        for gap, coef in steps:
+            res = Matrix.matmult(res, m if gap == 1 else m ** gap) + identity * coef
+        if last > 0:
+            res = Matrix.matmult(res, m if last == 1 else m ** last)
+        return res
+
+    # Horner's scheme on a batch of floats, at once on a NumPy array when
+    # NumPy is available. Returns a list, or an array if given an array
+    def evaluate_many(self, values: 'Iterable[float]') -> 'Union[List, np.ndarray]':
+        lead, steps, last = self._horner_steps()
+        lead = float_value(lead)
+        steps = [(gap, float_value(coef)) for gap, coef in steps]
+        if np is None:
+            return [Poly._horner_float(x, lead, steps, last) for x in values]
+        xs = values if isinstance(values, np.ndarray) else np.asarray(list(values), dtype=float)
+        res = Poly._horner_float(xs, lead, steps, last) + np.zeros_like(xs)
+        return res if isinstance(values, np.ndarray) else res.tolist()
+
+    @classmethod
+    def _horner_float(cl, x, lead, steps: 'List[Tuple[int, Union[float, complex]]]', last: 'int'):
+        res = lead
+        for gap, coef in steps:
+            res = res * (x if gap == 1 else x ** gap) + coef
+        if last > 0:
+            res = res * (x if last == 1 else x ** last)
+        return res
+
     # def __rpow__(self, other: 'Scalar') -> 'Scalar':
     #     pass
 
+    # Degree of the zero polynomial is -1
     def degree(self) -> 'int':
-        return
+        if self._coefs is not None:
+            return len(self._coefs) - 1
+        return max(self._d.keys(), default=-1)
 
     @classmethod
-    def float_str(cl, val: 'float') -> None:
-        return f"{val:.6f}".rstrip('0').rstrip('.')
+    def complex_str(cl, val: 'complex') -> 'str':
+        if val.imag == 0:
+            return decimal_str(val.real)
+        sign = '-' if val.imag < 0 else '+'
+        if val.real == 0:
+            return f"{'-' if sign == '-' else ''}{decimal_str(abs(val.imag))} * i"
+        return f"{decimal_str(val.real)} {sign} {decimal_str(abs(val.imag))} * i"
 
-    def print_solutions(self) -> None:
-        degree = 0 if len(self.d) == 0 else max(self.d.keys())
-        d_float = {i: float(v) for i, v in self.d.items()}
+    @classmethod
+    def _exact_sqrt(cl, val: 'Rational') -> 'Union[Rational, None]':
+        # val is non negative
+        num, denum = isqrt(val.num), isqrt(val.denum)
+        if num * num != val.num or denum * denum != val.denum:
+            return None
+        return Rational(num, denum)
 
-        # Print reduced form and degree
-        print(f"Reduced form: {self} = 0")
-        print(f"Polynomial degree: {degree}")
+    def solve(self, tol: 'float' = DEFAULT_TOLERANCE) -> 'Solution':
+        degree = max(self.degree(), 0)
+        reduced_form = f"{self} = 0"
 
         if degree == 0:
-            if len(self.d) == 0 or self.d[0] == 0:
-                print("The equation simplifies to '0 = 0', solution is the whole real field")
-            else:
-                print("No solutions")
-            return
-
-        # Print solutions depending on degree
-        if degree > 2:
-            print("The polynomial degree is strictly greater than 2, I can't solve.")
-
-        elif degree == 1:
-            b = 0 if 0 not in d_float else d_float[0]
-            a = d_float[1]
-            root = - b / a
-            print("The unique solution is:")
-            print(Poly.float_str(root))
-
-        elif degree == 2:
-            c = 0 if 0 not in d_float else d_float[0]
-            b = 0 if 1 not in d_float else d_float[1]
-            a = d_float[2]
-
-            delta = b ** 2 - 4 * a * c
-
-            if delta > 0:
-                delta_sqrt = sqrt(delta)
-                root1 = (- b - delta_sqrt) / (2 * a)
-                root2 = (- b + delta_sqrt) / (2 * a)
-                print("Discriminant is strictly positive, the two solutions are:")
-                print(Poly.float_str(root1))
-                print(Poly.float_str(root2))
-
-            elif delta == 0:
-                root = - b / (2 * a)
-                print("Discriminant is zero, the unique solution is:")
-                print(Poly.float_str(root))
+            if self.degree() < 0:
+                return Solution(Solution.ALL_VALUES, reduced_form, degree)
+            return Solution(Solution.NO_SOLUTION, reduced_form, degree)
 
-            else:
-                delta_sqrt_abs = sqrt(abs(delta))
-                real = - b / (2 * a)
-                imag = delta_sqrt_abs / (2 * a)
-                print("Discriminant is strictly negative (no real solution), the two complex solutions are:")
-                if real != 0:
-                    print(f"{Poly.float_str(real)} + {Poly.float_str(abs(imag))} * i")
-                    print(f"{Poly.float_str(real)} - {Poly.float_str(abs(imag))} * i")
-                else:
-                    print(f"{Poly.float_str(abs(imag))} * i")
-                    print(f"-{Poly.float_str(abs(imag))} * i")
+        exact = all(isinstance(v, Rational) for v in self.d.values())
+        if degree > 2 or not exact:
+            if degree == 1:
+                roots = [-self.d.get(0, Rational.zero()) / self.d[1]]
+                return Solution(Solution.UNIQUE, reduced_form, degree, roots)
+            exact_roots, roots = self.split_roots(tol)
+            if len(roots) == 0:
+                return Solution(Solution.RATIONAL, reduced_form, degree, exact_roots)
+            roots += [complex(float_value(r)) for r in exact_roots]
+            roots.sort(key=lambda z: (z.imag != 0, z.real, z.imag))
+            return Solution(Solution.NUMERIC, reduced_form, degree, roots)
+
+        if degree == 1:
+            b = self.d.get(0, Rational.zero())
+            a = self.d[1]
+            return Solution(Solution.UNIQUE, reduced_form, degree, [-b / a])
+
+        c = self.d.get(0, Rational.zero())
+        b = self.d.get(1, Rational.zero())
+        a = self.d[2]
+        delta = b * b - a * c * 4
+
+        if delta == 0:
+            return Solution(Solution.ZERO_DISCRIMINANT, reduced_form, degree, [-b / (a * 2)], delta)
+
+        # Exact roots when the discriminant is a square, floats otherwise
+        delta_sqrt = Poly._exact_sqrt(delta if delta > 0 else -delta)
+        if delta_sqrt is None:
+            delta_sqrt = sqrt(abs(float(delta)))
+            b, a = float(b), float(a)
+        if delta > 0:
+            roots = [(-b - delta_sqrt) / (a * 2), (-b + delta_sqrt) / (a * 2)]
+            return Solution(Solution.POSITIVE_DISCRIMINANT, reduced_form, degree, roots, delta)
+        real = -b / (a * 2)
+        imag = delta_sqrt / (a * 2)
+        if not imag >= 0:
+            imag = -imag
+        if isinstance(imag, Rational):
+            roots = [Complex(real, imag), Complex(real, -imag)]
+        else:
+            roots = [complex(real, imag), complex(real, -imag)]
+        return Solution(Solution.NEGATIVE_DISCRIMINANT, reduced_form, degree, roots, delta)
+
+    def print_solutions(self, tol: 'float' = DEFAULT_TOLERANCE) -> None:
+        print(self.solve(tol))
 
     def __str__(self, variable_name = "x"):
         if len(self.d) == 0:
@@ -146,3 +394,50 @@ class Poly:
     def __repr__(self) -> str:
         return self.__str__()
 
+
+# Result of Poly.solve: roots are exact values (Rational / Complex) when
+# possible, Python floats / complexes otherwise
+class Solution:
+    ALL_VALUES = "ALL_VALUES"
+    NO_SOLUTION = "NO_SOLUTION"
+    UNIQUE = "UNIQUE"
+    POSITIVE_DISCRIMINANT = "POSITIVE_DISCRIMINANT"
+    ZERO_DISCRIMINANT = "ZERO_DISCRIMINANT"
+    NEGATIVE_DISCRIMINANT = "NEGATIVE_DISCRIMINANT"
+    NUMERIC = "NUMERIC"
+    RATIONAL = "RATIONAL"
+
+    headers = {
+        ALL_VALUES: "The equation simplifies to '0 = 0', solution is the whole real field",
+        NO_SOLUTION: "No solutions",
+        UNIQUE: "The unique solution is:",
+        POSITIVE_DISCRIMINANT: "Discriminant is strictly positive, the two solutions are:",
+        ZERO_DISCRIMINANT: "Discriminant is zero, the unique solution is:",
+        NEGATIVE_DISCRIMINANT: "Discriminant is strictly negative (no real solution), the two complex solutions are:",
+    }
+
+    def __init__(self, kind: 'str', reduced_form: 'str', degree: 'int',
+                 roots: 'List' = None, discriminant: 'Rational' = None) -> None:
+        self.kind = kind
+        self.reduced_form = reduced_form
+        self.degree = degree
+        self.roots = [] if roots is None else roots
+        self.discriminant = discriminant
+
+    def float_roots(self) -> 'List[complex]':
+        return [complex(float_value(r)) if isinstance(r, (Rational, Complex)) else complex(r)
+                for r in self.roots]
+
+    def __str__(self) -> 'str':
+        lines = [f"Reduced form: {self.reduced_form}", f"Polynomial degree: {self.degree}"]
+        if self.kind == Solution.NUMERIC:
+            lines.append(f"Numeric approximation of the {self.degree} solutions (with multiplicity):")
+        elif self.kind == Solution.RATIONAL:
+            lines.append(f"The {self.degree} solutions are rational (with multiplicity):")
+        else:
+            lines.append(Solution.headers[self.kind])
+        lines.extend(Poly.complex_str(root) for root in self.float_roots())
+        return "\n".join(lines)
+
+    def __repr__(self) -> 'str':
+        return self.__str__()
@@ -1,43 +1,119 @@
-from typing import Union, Tuple
+from typing import Union, Tuple, Iterable, List, Set, Dict
 
-from .blocks.expressions import Expr
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .blocks.expressions import Expr, Function, Builtin
 from .blocks.math_types import Rational, Complex, Matrix
+from .blocks.poly import Solution
+from .blocks.optimizer import optimize
 from .parsing.tokenizing import Lexer, Token, is_variable, tokenize, \
                                 is_function, function_argument_names
 from .parsing.parser import Parser
-from .utils.errors import WrongEqualSignCount, NonPolynomialEquation
+from .parsing.parse_cache import ParseCache
+from .utils.errors import Error, WrongEqualSignCount, NonPolynomialEquation, \
+                          UnknownFunctionError, ExpressionTooDeepError
+from .utils.python_types import Context
 
 Value = Union['Rational', 'Complex', 'Matrix']
 
 
-def expression_from_str(line: 'str', context: 'dict', function_definition: 'Tuple[str, str]' = None) -> 'Expr':
+# Functions available in every session (put in the parent scope of the
+# session context, so that they can be shadowed)
+def builtin_functions() -> 'Dict[str, Builtin]':
+    return {
+        'det': Builtin('det', Matrix.det, (Matrix,)),
+        'inv': Builtin('inv', Matrix.inv, (Matrix,)),
+        'solve': Builtin('solve', Matrix.solve, (Matrix, Matrix)),
+    }
+
+
+def _parse_expression(line: 'str', context: 'Context', function_definition: 'Tuple[str, str]' = None) -> 'Tuple[Expr, Set[str]]':
     toks = tokenize(line)
     lex = Lexer(toks)
     pars = Parser(lex, context, function_definition)
     e = pars.expr()
     pars.expect_eof()
-    ####
-    e.replace(context)
-    ####
+    e = e.replace(context)
     pars.check_unknown_variables()
     # print(f"Expression : {e}")
-    return e
+    return e, pars.variables_present
+
+def expression_from_str(line: 'str', context: 'Context', function_definition: 'Tuple[str, str]' = None,
+                        parse_cache: 'ParseCache' = None) -> 'Expr':
+    parse = lambda: _parse_expression(line, context, function_definition)
+    if parse_cache is None:
+        return parse()[0]
+    return parse_cache.get((line, function_definition), context, parse)
 
-def expression_and_variables_from_str(line: 'str', context: 'dict'):
+def expression_and_variables_from_str(line: 'str', context: 'Context'):
     toks = tokenize(line)
     lex = Lexer(toks)
     pars = Parser(lex, context)
     e = pars.expr()
-    e.replace(context)
-    return e, pars.unknown_variables()
+    return e.replace(context), pars.unknown_variables()
 
 
-def evaluate(line: 'str', context: 'dict') -> 'Value':
-    expr = expression_from_str(line, context)
+def evaluate(line: 'str', context: 'Context', parse_cache: 'ParseCache' = None) -> 'Value':
+    expr = expression_from_str(line, context, parse_cache=parse_cache)
     return expr.evaluate(context)
 
 
-def interpret(line, context: 'dict | str'):
+def _exact_value(value: 'Union[int, float, Value]') -> 'Value':
+    if isinstance(value, float):
+        return Rational.from_float(value)
+    if isinstance(value, int):
+        return Rational(value)
+    return value
+
+
+def _evaluate_many_float(fun: 'Function', values: 'List[float]', context: 'Context') -> 'List':
+    poly = fun.poly()
+    if poly is not None:
+        if np is None:
+            return poly.evaluate_many(values)
+        with np.errstate(all='raise'):
+            return poly.evaluate_many(values)
+    if np is None:
+        return [fun(v, context, to_float=True) for v in values]
+    xs = np.array(values, dtype=float)
+    with np.errstate(all='raise'):
+        res = fun(xs, context, to_float=True)
+    return np.broadcast_to(res, xs.shape).tolist()
+
+
+# Evaluates the stored function 'fun_name' on every value. If all values
+# are floats, the function is run on floats (vectorized when NumPy is
+# available), otherwise or if the float run fails, with exact Rationals
+def evaluate_many(fun_name: 'str', values: 'Iterable', context: 'Context') -> 'List':
+    if not fun_name in context:
+        raise UnknownFunctionError(fun_name)
+    fun = context[fun_name]
+    values = list(values)
+    if len(values) > 0 and all(isinstance(v, float) for v in values):
+        try:
+            return _evaluate_many_float(fun, values, context)
+        except (Error, ArithmeticError, TypeError):
+            pass
+    return [fun(_exact_value(v), context) for v in values]
+
+
+# Returns the value to display: the evaluated value, the assigned value or
+# function, or the Solution of the equation
+# Expressions are parsed and walked recursively : a line nested too deeply
+# for the Python stack is reported as an error of that line
+def interpret(line, context: 'Context', memo_size: 'int' = 0,
+              parse_cache: 'ParseCache' = None) -> 'Union[Value, Function, Solution]':
+    try:
+        return _interpret(line, context, memo_size, parse_cache)
+    except RecursionError:
+        raise ExpressionTooDeepError() from None
+
+
+def _interpret(line, context: 'Context', memo_size: 'int' = 0,
+               parse_cache: 'ParseCache' = None) -> 'Union[Value, Function, Solution]':
     n_equals = line.count('=')
     if n_equals != 1:
         raise WrongEqualSignCount(n_equals)
@@ -45,7 +121,7 @@ def interpret(line, context: 'dict | str'):
     left, right = left.strip(), right.strip()
 
     if right == '?':
-        print(evaluate(left, context))
+        return evaluate(left, context, parse_cache)
 
     elif right.endswith('?'):
         right = right[:-1]
@@ -53,38 +129,27 @@ def interpret(line, context: 'dict | str'):
         right_expr, right_variables = expression_and_variables_from_str(right, context)
         assert(len(left_variables.union(right_variables)) <= 1)
         
-        right_expr.apply_sign(Token.MINUS)
-        left_expr.extend(right_expr)
-        left_expr.replace(context)
-        left_expr = left_expr.fun_expanded(context)
-        left_expr.do_modulos()
+        left_expr = Expr([*left_expr.terms, *right_expr.signed(Token.MINUS).terms])
+        left_expr = left_expr.replace(context).fun_expanded(context).do_modulos()
         # print(f"expr is polynomial: {left_expr.is_polynomial()}")
         if left_expr.is_polynomial():
-            poly = left_expr.to_polynomial()
-            poly.print_solutions()
-        else:
-            raise NonPolynomialEquation()
+            return left_expr.to_polynomial().solve()
+        raise NonPolynomialEquation()
 
     else:
         if is_variable(left):
-            context[left] = evaluate(right, context)
-            print(context[left])
+            context[left] = evaluate(right, context, parse_cache)
+            Function.invalidate_memos(left)
+            return context[left]
 
         elif is_function(left):
             fun_name, variable_name = function_argument_names(left)
 
-            fun_expr = expression_from_str(right, context, function_definition=(fun_name, variable_name))
-            fun_expr.replace(context)
-            fun_expr = fun_expr.fun_expanded(context)
-
-            context[fun_name] = (fun_expr, variable_name)
-            if fun_expr.is_polynomial():
-                print("IS POLYNOMIAL")
-                poly = fun_expr.to_polynomial()
-                print(poly.__str__(variable_name=variable_name))
-                print(f"poly dict : {poly.d}")
-            else:
-                print(fun_expr)
-            #....
-        else:
-            raise Exception()
+            fun_expr = expression_from_str(right, context, (fun_name, variable_name), parse_cache)
+            fun_expr = optimize(fun_expr.fun_expanded(context))
+
+            context[fun_name] = Function(fun_expr, variable_name, memo_size)
+            Function.invalidate_memos(fun_name)
+            return context[fun_name]
+
+        raise Exception()
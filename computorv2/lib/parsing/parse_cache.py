@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from typing import Tuple, Iterable, Callable
+
+from ..utils.scope import Scope
+
+
+# LRU cache of parsed expressions, keyed by the source text (and the
+# function being defined, if any). Parsing substitutes the known variables
+# by their values, so an entry also records the version of every name the
+# expression mentions, and is dropped as soon as one of them changed.
+class ParseCache:
+    def __init__(self, size: 'int' = 128) -> None:
+        self.size = size
+        self.entries: 'OrderedDict[Tuple, Tuple]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def _versions(cl, names: 'Iterable[str]', context: 'Scope') -> 'Tuple':
+        return tuple((name, context.version(name)) for name in names)
+
+    def get(self, key: 'Tuple', context: 'Scope', parse: 'Callable'):
+        if self.size == 0 or not isinstance(context, Scope):
+            return parse()[0]
+        entry = self.entries.get(key)
+        if entry is not None:
+            expr, versions = entry
+            if all(context.version(name) == version for name, version in versions):
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return expr
+            del self.entries[key]
+        self.misses += 1
+        expr, names = parse()
+        self.entries[key] = (expr, ParseCache._versions(names, context))
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return expr
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def info(self) -> 'str':
+        lookups = self.hits + self.misses
+        rate = 100 * self.hits / lookups if lookups > 0 else 0
+        return f"hits={self.hits}, misses={self.misses}, hit rate={rate:.1f}%, "\
+            f"size={len(self.entries)}/{self.size}"
@@ -1,22 +1,18 @@
 from typing import Iterable, Union, List, Tuple
-from .tokenizing import Token, Lexer, is_variable, is_number
-from ..blocks.expressions import Literal, Term, Expr
+from .tokenizing import Token, Lexer, LITERAL_TYPES
+from ..blocks.expressions import Literal, Term, Expr, Arguments
 from ..blocks.math_types import Rational, Matrix
 from ..utils.errors import UnexpectedTokenError, UnknownVariablesError, MatrixInMatrixError, RecursiveFunctionDefinitonError
 from ..utils.python_types import Context
+from ..utils.scope import Scope
 
 
 def rational_from_str(tok: 'str') -> 'Rational':
-    tok = tok.rstrip('0').rstrip('.')
-    if tok == '':
-        return Rational(0)
-    elif '.' not in tok:
+    if '.' not in tok:
         return Rational(int(tok))
-    else:
-        int_part, dec_part = tok.split('.')
-        pow_ten = 10 ** len(dec_part)
-        int_part, dec_part = int(int_part), int(dec_part)
-        return Rational(int_part * pow_ten + dec_part, pow_ten)
+    int_part, dec_part = tok.rstrip('0').split('.')
+    pow_ten = 10 ** len(dec_part)
+    return Rational(int(int_part) * pow_ten + int(dec_part or '0'), pow_ten)
 
 # """
 # matl   : LBRACK INTEGER (COMA INTEGER)* RBRACK
@@ -29,27 +25,24 @@ def rational_from_str(tok: 'str') -> 'Rational':
 
 class Parser:
 
-    def __init__(self, lexer: 'Lexer', context: 'Context' = dict(), function_definition: 'Tuple[str, str]' = None):
+    def __init__(self, lexer: 'Lexer', context: 'Context' = None, function_definition: 'Tuple[str, str]' = None):
         self.lexer: Lexer = lexer
         self.current_token: Token = lexer.next_token()
         self.variables_present = set()
-        self.context = context
+        self.context = Scope() if context is None else context
         self.is_fun_definition = function_definition is not None
         if self.is_fun_definition:
             self.function_name = function_definition[0]
             self.function_variable = function_definition[1]
 
-    def eat(self, token_type: 'Union[str, Iterable[str]]' = None) -> 'Token':
+    # token_type: a token type or a tuple of accepted types
+    def eat(self, token_type: 'Union[int, Tuple[int, ...]]' = None) -> 'Token':
         tok = self.current_token
-        if isinstance(token_type, str):
-            condition = (tok.type == token_type)
-        elif isinstance(token_type, Iterable):
-            condition = (tok.type in token_type)
-        if token_type == None or condition:
+        if token_type is None or tok.type == token_type \
+                or (type(token_type) is tuple and tok.type in token_type):
             self.current_token = self.lexer.next_token()
             return tok
-        else:
-            raise UnexpectedTokenError(self.lexer, tok)
+        raise UnexpectedTokenError(self.lexer, tok)
 
     # matline: LBRACK unit_literal (COMA unit_literal)* RBRACK
     def matline(self) -> 'List[Literal]':
@@ -75,7 +68,7 @@ class Parser:
 
     # Will produce a matrix for a matline or matfull
     def matrix(self) -> 'Literal':
-        tok1 = self.lexer.get_token(1)
+        tok1 = self.lexer.peek(1)
         if tok1.type != Token.LBRACK:
             m = Matrix([self.matline()])
         else:
@@ -83,11 +76,11 @@ class Parser:
         return Literal(Literal.MATRIX, m)
 
     def unit_literal(self) -> 'Literal':
-        tok = self.eat(Token.LITERAL)
-        if is_number(tok.value):
+        tok = self.eat(LITERAL_TYPES)
+        if tok.type == Token.NUMBER:
             type = Literal.NUMBER
             value = rational_from_str(tok.value)
-        elif is_variable(tok.value):
+        elif tok.type == Token.VARIABLE:
             if self.is_fun_definition and tok.value == self.function_variable:
                 type = Literal.FUN_VARIABLE
             else:
@@ -98,14 +91,23 @@ class Parser:
             raise Exception("Invalid use of Parse._token_to_unit_litteral")
         return Literal(type, value)
 
-    # ---->
+    # function: VARIABLE LPAR argument (COMA argument)* RPAR
     def function(self) -> 'Literal':
-        fname = self.eat(Token.LITERAL).value
+        fname = self.eat(Token.VARIABLE).value
         #
 
         self.eat(Token.LPAR)
+        args = [self.argument()]
+        while self.current_token.type == Token.COMA:
+            self.eat()
+            args.append(self.argument())
+        self.eat(Token.RPAR)
+        arg = args[0] if len(args) == 1 else Arguments(args)
+        return Literal(Literal.FUNCTION, (fname, arg))
+
+    def argument(self) -> 'Union[Expr, Literal]':
         tok = self.current_token
-        if tok.type == Token.LITERAL:
+        if tok.type in LITERAL_TYPES:
             arg = self.expr(matrix_allowed=True)
             # if is_variable(tok.value) and self.is_fun_definition and tok.value == self.function_variable:
             #     raise RecursiveFunctionDefinitonError()
@@ -115,16 +117,15 @@ class Parser:
             arg = self.matrix()
         else:
             raise UnexpectedTokenError(self.lexer, self.current_token)
-        self.eat(Token.RPAR)
-        return Literal(Literal.FUNCTION, (fname, arg))
+        return arg
 
-    def eat_optional_sign(self) -> 'str':
+    def eat_optional_sign(self) -> 'int':
         if self.current_token.type in (Token.PLUS, Token.MINUS):
             return self.eat().type
         else:
             return Token.PLUS
 
-    def eat_sign(self) -> 'str':
+    def eat_sign(self) -> 'int':
         return self.eat((Token.PLUS, Token.MINUS)).type
 
     # (must be signed)    literal: (PLUS | MINUS) (unit_literal | matfull | function)
@@ -133,9 +134,9 @@ class Parser:
         tok = self.current_token
         # print("MAGAGHCDSHV")
         # print(f"self.current_token={self.current_token}")
-        # print(f"self.lexer.get_token(1)={self.lexer.get_token(1)}")
-        if tok.type == Token.LITERAL:
-            if self.lexer.get_token(1).type == Token.LPAR:
+        # print(f"self.lexer.peek(1)={self.lexer.peek(1)}")
+        if tok.type in LITERAL_TYPES:
+            if tok.type == Token.VARIABLE and self.lexer.peek(1).type == Token.LPAR:
                 # print("CANARFUN")
                 return self.function()
             else:
@@ -165,10 +166,10 @@ class Parser:
         # can_skip_mult_left = lambda: (self.current_token.type in (Token.LPAR, Token.EOF) or is_number(self.current_token.value))
         # can_skip_mult_right = lambda: (is_variable(self.current_token.value) or self.current_token.type == Token.LPAR)
         is_term_operation = lambda: (self.current_token.type in (Token.MULT, Token.DIV, Token.MOD, Token.MATMULT, Token.POW))
-        is_term_factor = lambda: (self.current_token.type in (Token.LITERAL, Token.LPAR))
+        is_term_factor = lambda: (self.current_token.type in (Token.NUMBER, Token.VARIABLE, Token.LPAR))
 
         def can_skip_mult(left, right):
-            return is_number(left.value) and is_variable(right.value)
+            return left.type == Token.NUMBER and right.type == Token.VARIABLE
 
         # print(f"self.current_token={self.current_token}")
         # can_skip_mult = can_skip_mult_left()
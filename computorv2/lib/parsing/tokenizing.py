@@ -1,22 +1,9 @@
 #!/usr/bin/env python3
 
 import re
+from typing import List
 from ..utils.errors import UnKnownTokenError
 
-tokens_patterns = [
-    r'\(', r'\)', r'\[', r'\]', ',', ';',
-    r'\+', r'\-', r'\*{1,2}', '/', '%', r'\^', '=',
-    r'[a-zA-Z]+', r'\d+(?:\.\d*)?', r'\S'
-]
-token_pattern = '|'.join(tokens_patterns)
-token_pattern_valid = '|'.join(tokens_patterns[:-1])
-def tokenize(line):
-    tokens = re.findall(token_pattern, line)
-    for token in tokens:
-        if not re.fullmatch(token_pattern_valid, token):
-            raise UnKnownTokenError(token)
-    return tokens
-
 is_variable = lambda tok: (re.fullmatch(r'[a-zA-Z]+', tok) != None)
 is_number = lambda tok: (re.fullmatch(r'\d+(\.\d*)?', tok) != None)
 is_literal = lambda tok: (is_variable(tok) or is_number(tok))
@@ -25,32 +12,30 @@ function_pattern = r'\s*([a-zA-Z]+)\s*\(\s*([a-zA-Z]+)\s*\)'
 is_function = lambda tok: (re.match(function_pattern, tok) != None)
 function_argument_names = lambda tok: re.match(function_pattern, tok).groups()
 
+# Token types are small ints, so that the comparisons done by the parser
+# are plain int comparisons
 class Token:
-    LITERAL = "LITERAL"
-    VARIABLE = "VARIABLE"
-    FUNCTION = "FUNCTION"
-    PLUS = "PLUS"
-    MINUS = "MINUS"
-    MULT = "MULT"
-    MATMULT = "MATMULT"
-    DIV = "DIV"
-    MOD = "MOD"
-    POW = "POW"
-    LPAR = "LPAR"
-    RPAR = "RPAR"
-    LBRACK = "LBRACK"
-    RBRACK = "RBRACK"
-    COMA = "COMA"
-    SEMICOL = "SEMICOL"
-    EQUAL = "EQUAL"
-    EOF = "EOF"
-
-    def __init__(self, type: 'str', value: 'str') -> None:
+    __slots__ = ('type', 'value', 'pos')
+
+    LITERAL, NUMBER, VARIABLE, FUNCTION, PLUS, MINUS, MULT, MATMULT, DIV, MOD, \
+        POW, LPAR, RPAR, LBRACK, RBRACK, COMA, SEMICOL, EQUAL, EOF = range(19)
+
+    # pos: offset of the token in the source line
+    def __init__(self, type: 'int', value: 'str', pos: 'int' = None) -> None:
         self.type = type
         self.value = value
+        self.pos = pos
 
     def __str__(self) -> None:
-        return f"Token({self.type}, '{self.value}')"
+        return f"Token({token_type_names[self.type]}, '{self.value}')"
+
+    def __repr__(self) -> 'str':
+        return self.__str__()
+
+token_type_names = {v: k for k, v in vars(Token).items() if type(v) is int}
+
+# A unit literal is either a number or a variable name
+LITERAL_TYPES = (Token.NUMBER, Token.VARIABLE)
 
 punctuation_dict = {
     '(': Token.LPAR,
@@ -70,30 +55,45 @@ punctuation_dict = {
 }
 tokens_str = {t: s for s, t in punctuation_dict.items()}
 
-class Lexer:
-    def __init__(self, tokens: 'list') -> None:
-        self.tokens = tokens
-        self.pos = -1
+# Single master regex, one group per token type ('**' before '*').
+# SKIP eats whitespaces, UNKNOWN catches any other character
+SKIP, UNKNOWN = -1, -2
+tokens_patterns = [
+    (Token.NUMBER, r'\d+(?:\.\d*)?'),
+    (Token.VARIABLE, r'[a-zA-Z]+'),
+    (Token.MATMULT, r'\*\*'),
+    *((t, re.escape(s)) for s, t in punctuation_dict.items() if t != Token.MATMULT),
+    (SKIP, r'\s+'),
+    (UNKNOWN, r'.'),
+]
+token_regex = re.compile('|'.join(f"({p})" for t, p in tokens_patterns))
+group_types = [None, *(t for t, p in tokens_patterns)]
 
-    @classmethod
-    def eof_token(cl) -> 'Token':
-        return Token(Token.EOF, None)
+def tokenize(line: 'str') -> 'List[Token]':
+    tokens = []
+    for m in token_regex.finditer(line):
+        type = group_types[m.lastindex]
+        if type == SKIP:
+            continue
+        if type == UNKNOWN:
+            raise UnKnownTokenError(m.group())
+        tokens.append(Token(type, m.group(), m.start()))
+    return tokens
 
-    @classmethod
-    def str_to_token(cl, s: 'str') -> 'Token':
-        if s in punctuation_dict:
-            return Token(punctuation_dict[s], s)
-        assert(is_literal(s))
-        return Token(Token.LITERAL, s)
+# The tokens are frozen in a tuple ending with the EOF token, so that
+# looking ahead is a simple index
+class Lexer:
+    def __init__(self, tokens: 'List[Token]') -> None:
+        end = tokens[-1].pos + len(tokens[-1].value) if len(tokens) > 0 else 0
+        self.tokens = (*tokens, Token(Token.EOF, None, end))
+        self.last = len(self.tokens) - 1
+        self.pos = -1
 
     def next_token(self) -> 'Token':
-        self.pos += 1
-        if self.pos >= len(self.tokens):
-            return Lexer.eof_token()
-        current_token = self.tokens[self.pos]
-        return self.str_to_token(current_token)
-
-    def get_token(self, i: 'int') -> 'Token':
-        if self.pos + i >= len(self.tokens):
-            return Lexer.eof_token()
-        return self.str_to_token(self.tokens[self.pos + i])
+        if self.pos < self.last:
+            self.pos += 1
+        return self.tokens[self.pos]
+
+    # Token k positions after the current one (EOF past the end)
+    def peek(self, k: 'int') -> 'Token':
+        return self.tokens[min(self.pos + k, self.last)]
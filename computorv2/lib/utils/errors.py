@@ -40,10 +40,23 @@ class MatrixInMatrixError(LogicError):
         super().__init__("You can't put a Matrix in a Matrix "\
             "(and valid matrix dimensions are 1 and 2)")
 
+class ArgumentCountError(LogicError):
+    def __init__(self, fun_name: str, expected: int, given: int) -> None:
+        super().__init__(f"Function {fun_name} takes {expected} argument(s), {given} given")
+
+class InvalidArgumentError(LogicError):
+    def __init__(self, fun_name: str, value, expected: str) -> None:
+        value = str(value).replace('\n', ';')
+        super().__init__(f"Invalid argument for function {fun_name}: {value} (expected {expected})")
+
 class RecursiveFunctionDefinitonError(LogicError):
      def __init__(self) -> None:
          super().__init__("Recursive function definition")
 
+class ExpressionTooDeepError(LogicError):
+    def __init__(self) -> None:
+        super().__init__("Expression too deeply nested")
+
 
 # Math Errors
 class MathError(Error):
@@ -51,9 +64,9 @@ class MathError(Error):
         super().__init__("Math error: " + message)
 
 class IncompatibleMatrixShapeError(MathError):
-    def __init__(self, m1, m2) -> None:
+    def __init__(self, m1, m2, op_name: str = "multiplication") -> None:
         message = f"The following matrices have incompatible shape "\
-            f"for matrix multiplication :\n{m1}\nand\n{m2}"
+            f"for matrix {op_name} :\n{m1}\nand\n{m2}"
         super().__init__(message)
 
 class DifferentMatrixShapeError(MathError):
@@ -64,10 +77,16 @@ class DifferentMatrixShapeError(MathError):
             f"{(m1.h, m1.w)} and {(m2.h, m2.w)}"
         super().__init__(message)
 
-class MatrixDivisionOperatorError(MathError):
-    def __init__(self, m1, m2) -> None:
-        message = f"You can't use the division operator '/' "\
-            f"between two matrices.\nSaid matrices are\n{m1}\nand\n{m2}"
+class NonSquareMatrixError(MathError):
+    def __init__(self, m, op_name: str) -> None:
+        message = f"Matrix {op_name} needs a square matrix, "\
+            f"but this one has shape {(m.h, m.w)} :\n{m}"
+        super().__init__(message)
+
+class SingularMatrixError(MathError):
+    def __init__(self, m) -> None:
+        message = f"This matrix is singular (its determinant is zero), "\
+            f"it has no inverse :\n{m}"
         super().__init__(message)
 
 class DivisionByZeroError(MathError):
@@ -103,3 +122,7 @@ class NonPolynomialEquation(MathError):
 class NotANumberError(MathError):
     def __init__(self, value) -> None:
         super().__init__(f"Cannot convert '{value}' to a scalar value")
+
+class RootFindingError(MathError):
+    def __init__(self, degree) -> None:
+        super().__init__(f"Cannot compute the roots of a degree {degree} polynomial with floats")
@@ -0,0 +1,82 @@
+from typing import List, Tuple, Union
+
+# Determinant and linear system kernels, on square systems given as lists
+# of rows (each row holds the n coefficients followed by the right-hand
+# sides, if any). Singular systems are reported by a None result.
+# - Integers: fraction-free Bareiss elimination. Every intermediate entry
+#   is a minor of the input, so the integers stay as small as the result
+#   and the only divisions are exact.
+# - Other exact values (Complexes): Gaussian elimination on the values.
+# Float matrices are handed to NumPy (LAPACK's LU with partial pivoting).
+
+
+# Eliminates the first n columns in place (rows end up upper triangular
+# on them, row swaps included) and returns the determinant
+def bareiss(rows: 'List[List[int]]', n: 'int') -> 'int':
+    sign, previous = 1, 1
+    for k in range(n):
+        if rows[k][k] == 0:
+            for i in range(k + 1, n):
+                if rows[i][k] != 0:
+                    rows[k], rows[i] = rows[i], rows[k]
+                    sign = -sign
+                    break
+            else:
+                return 0
+        row_k = rows[k]
+        pivot = row_k[k]
+        width = len(row_k)
+        for i in range(k + 1, n):
+            row_i = rows[i]
+            f = row_i[k]
+            for j in range(k + 1, width):
+                row_i[j] = (row_i[j] * pivot - f * row_k[j]) // previous
+            row_i[k] = 0
+        previous = pivot
+    return sign * rows[n - 1][n - 1]
+
+
+# Solves the integer system given by the augmented rows: returns the
+# numerators of the solutions (one list per right-hand side) and their
+# common denominator, or None if the system is singular
+def bareiss_solve(rows: 'List[List[int]]', n: 'int') -> 'Union[Tuple[List[List[int]], int], None]':
+    if bareiss(rows, n) == 0:
+        return None
+    # d * x is an integer vector for the last pivot d (Cramer's rule), so
+    # the back substitution is exact too
+    d = rows[n - 1][n - 1]
+    solutions = []
+    for c in range(n, len(rows[0])):
+        x = [0] * n
+        for i in range(n - 1, -1, -1):
+            row = rows[i]
+            s = d * row[c]
+            for j in range(i + 1, n):
+                s -= row[j] * x[j]
+            x[i] = s // row[i]
+        solutions.append(x)
+    return solutions, d
+
+
+# Gauss-Jordan elimination on exact values (first non zero pivot):
+# returns the solutions (one list per right-hand side) and the
+# determinant, or None if the system is singular
+def gauss_solve(rows: 'List[List]', n: 'int') -> 'Union[Tuple[List[List], object], None]':
+    det, sign = None, 1
+    for k in range(n):
+        p = next((i for i in range(k, n) if not rows[i][k] == 0), None)
+        if p is None:
+            return None
+        if p != k:
+            rows[k], rows[p] = rows[p], rows[k]
+            sign = -sign
+        pivot = rows[k][k]
+        det = pivot if det is None else det * pivot
+        row_k = [v / pivot for v in rows[k]]
+        rows[k] = row_k
+        for i in range(n):
+            f = rows[i][k]
+            if i != k and not f == 0:
+                rows[i] = [v - f * w for v, w in zip(rows[i], row_k)]
+    solutions = [[rows[i][c] for i in range(n)] for c in range(n, len(rows[0]))]
+    return solutions, (det if sign > 0 else -det)
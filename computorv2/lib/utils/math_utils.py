@@ -1,3 +1,12 @@
+from math import gcd, pi, cos, sin
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .errors import DivisionByZeroError
+
 def pgcd(a: 'int', b: 'int') -> 'int':
     if a == 0 and b == 0:
         raise Exception()
@@ -17,9 +26,112 @@ def ppcm(a: 'int', b: 'int') -> 'int':
     return a * b // pgcd(a, b)
 
 def reduce_fraction(a: 'int', b: 'int') -> 'tuple[int, int]':
-    p = pgcd(a, b)
+    if b == 0:
+        raise DivisionByZeroError()
+    if b == 1:
+        return (a, 1)
+    p = gcd(a, b)
     num = a // p
     denum = b // p
     if denum < 0:
         num, denum = -num, -denum
     return (num, denum)
+
+
+# Polynomial products on coefficient lists (index = power)
+
+KARATSUBA_THRESHOLD = 32
+# The pure Python FFT only beats Karatsuba on floats for long operands
+FFT_THRESHOLD = 32 if np is not None else 256
+
+def convolve_schoolbook(a: 'list', b: 'list', zero) -> 'list':
+    res = [zero] * (len(a) + len(b) - 1)
+    for i, va in enumerate(a):
+        if va == 0:
+            continue
+        for j, vb in enumerate(b):
+            res[i + j] = res[i + j] + va * vb
+    return res
+
+def add_lists(a: 'list', b: 'list') -> 'list':
+    if len(a) < len(b):
+        a, b = b, a
+    res = list(a)
+    for i, v in enumerate(b):
+        res[i] = res[i] + v
+    return res
+
+def convolve_karatsuba(a: 'list', b: 'list', zero) -> 'list':
+    if min(len(a), len(b)) < KARATSUBA_THRESHOLD:
+        return convolve_schoolbook(a, b, zero)
+    n_res = len(a) + len(b) - 1
+    m = max(len(a), len(b)) // 2
+    if len(a) <= m or len(b) <= m:
+        # Unbalanced sizes: cut the longest operand in chunks
+        if len(a) < len(b):
+            a, b = b, a
+        res = [zero] * n_res
+        for start in range(0, len(a), len(b)):
+            for i, v in enumerate(convolve_karatsuba(a[start:start + len(b)], b, zero)):
+                res[start + i] = res[start + i] + v
+        return res
+    a0, a1 = a[:m], a[m:]
+    b0, b1 = b[:m], b[m:]
+    z0 = convolve_karatsuba(a0, b0, zero)
+    z2 = convolve_karatsuba(a1, b1, zero)
+    z1 = convolve_karatsuba(add_lists(a0, a1), add_lists(b0, b1), zero)
+    res = [zero] * n_res
+    for i, v in enumerate(z0):
+        res[i] = res[i] + v
+        z1[i] = z1[i] - v
+    for i, v in enumerate(z2):
+        res[i + 2 * m] = res[i + 2 * m] + v
+        z1[i] = z1[i] - v
+    for i, v in enumerate(z1[:n_res - m]):
+        res[i + m] = res[i + m] + v
+    return res
+
+def _fft(values: 'list', invert: 'bool') -> 'list':
+    # Iterative radix-2 FFT, len(values) must be a power of two
+    n = len(values)
+    values = list(values)
+    j = 0
+    for i in range(1, n):
+        bit = n >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            values[i], values[j] = values[j], values[i]
+    length = 2
+    while length <= n:
+        angle = (2 if invert else -2) * pi / length
+        w_len = complex(cos(angle), sin(angle))
+        half = length // 2
+        ws = [w_len ** k for k in range(half)]
+        for start in range(0, n, length):
+            for k in range(half):
+                u = values[start + k]
+                v = values[start + k + half] * ws[k]
+                values[start + k] = u + v
+                values[start + k + half] = u - v
+        length <<= 1
+    if invert:
+        values = [v / n for v in values]
+    return values
+
+def convolve_fft(a: 'list', b: 'list') -> 'list':
+    n_res = len(a) + len(b) - 1
+    real = not any(isinstance(v, complex) for v in (*a, *b))
+    if np is not None:
+        if real:
+            size = 1 << (n_res - 1).bit_length()
+            return np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size)[:n_res].tolist()
+        size = 1 << (n_res - 1).bit_length()
+        return np.fft.ifft(np.fft.fft(a, size) * np.fft.fft(b, size))[:n_res].tolist()
+    size = 1 << (n_res - 1).bit_length()
+    fa = _fft(a + [0.0] * (size - len(a)), invert=False)
+    fb = _fft(b + [0.0] * (size - len(b)), invert=False)
+    res = _fft([x * y for x, y in zip(fa, fb)], invert=True)[:n_res]
+    return [v.real for v in res] if real else res
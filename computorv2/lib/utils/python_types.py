@@ -1,5 +1,5 @@
 Scalar = 'Union[Rational, Complex]'
-Context = 'Dict[str, Union[Rational, Complex, Expr]]'
+Context = 'Union[Scope, Dict[str, Union[Rational, Complex, Expr]]]'
 Value = 'Union[Rational, Complex, Matrix]'
 Factor = 'Union[Literal, Expr]'
 RationalOrInt = 'Union[int, Rational]'
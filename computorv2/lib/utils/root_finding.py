@@ -0,0 +1,279 @@
+import cmath
+from fractions import Fraction
+from math import pi, log, exp, inf, lcm
+from typing import List, Optional, Tuple
+
+from .errors import RootFindingError
+
+# Numeric roots of polynomials given by their coefficient list (index = power).
+# Degrees 1 to 4 use closed forms (in floats too, like the rest of this
+# module), higher degrees the Aberth-Ehrlich iteration. All roots are then
+# polished with a few Newton steps. The rational roots of polynomials with
+# rational coefficients are found exactly by split_rational_roots.
+#
+# computorv1/root_finding.py is a copy of this module (the two programs are
+# run standalone, each from its own directory): they differ only by the
+# annotations, the indentation and the error raised, and
+# tests_root_finding.py checks that they give the same roots.
+
+DEFAULT_TOLERANCE = 1e-12
+MAX_ITERATIONS = 500
+NEWTON_STEPS = 8
+# Imaginary parts this small (relative to the root) are considered rounding errors
+IMAG_EPSILON = 1e-9
+
+
+def _horner(coefs: 'List[complex]', z: 'complex') -> 'tuple':
+    # Value of the polynomial and of its derivative at z
+    p, dp = 0j, 0j
+    for c in reversed(coefs):
+        dp = dp * z + p
+        p = p * z + c
+    return p, dp
+
+def _newton_ratio(coefs: 'List[complex]', z: 'complex') -> 'Optional[complex]':
+    # p(z) / p'(z), None when z is a root. Outside the unit circle z^n
+    # overflows for high degrees, so the reversed polynomial q is evaluated
+    # at w = 1 / z instead: p(z) = z^n q(w), p'(z) = z^(n-1) (n q(w) - w q'(w))
+    if abs(z) <= 1:
+        p, dp = _horner(coefs, z)
+        if p == 0:
+            return None
+        return p / dp if dp != 0 else p
+    w = 1 / z
+    q, dq = _horner(coefs[::-1], w)
+    if q == 0:
+        return None
+    d = (len(coefs) - 1) * q - w * dq
+    return z * q / d if d != 0 else q
+
+def _log_residue(coefs: 'List[complex]', z: 'complex') -> 'float':
+    # log |p(z)|, computed without z^n as in _newton_ratio
+    if abs(z) <= 1:
+        p = abs(_horner(coefs, z)[0])
+        return log(p) if p != 0 else -inf
+    q = abs(_horner(coefs[::-1], 1 / z)[0])
+    return log(q) + (len(coefs) - 1) * log(abs(z)) if q != 0 else -inf
+
+def _quadratic_roots(c: 'complex', b: 'complex', a: 'complex') -> 'List[complex]':
+    sqrt_delta = cmath.sqrt(b * b - 4 * a * c)
+    # Avoid the cancellation between -b and the square root
+    q = -(b + sqrt_delta) / 2 if (b.conjugate() * sqrt_delta).real >= 0 else -(b - sqrt_delta) / 2
+    if q == 0:
+        return [0j, 0j]
+    return [q / a, c / q]
+
+def _cube_root(z: 'complex') -> 'complex':
+    if z == 0:
+        return 0j
+    return cmath.exp(cmath.log(z) / 3)
+
+def _cubic_roots(coefs: 'List[complex]') -> 'List[complex]':
+    # Cardano: x = t - b / 3a, t^3 + p t + q = 0
+    d, c, b, a = coefs
+    b, c, d = b / a, c / a, d / a
+    shift = -b / 3
+    p = c - b * b / 3
+    q = 2 * b ** 3 / 27 - b * c / 3 + d
+    sqrt_delta = cmath.sqrt(q * q / 4 + p ** 3 / 27)
+    u3 = -q / 2 + sqrt_delta
+    if abs(-q / 2 - sqrt_delta) > abs(u3):
+        u3 = -q / 2 - sqrt_delta
+    u = _cube_root(u3)
+    if u == 0:
+        return [shift] * 3
+    omega = cmath.exp(2j * pi / 3)
+    roots = []
+    for k in range(3):
+        uk = u * omega ** k
+        roots.append(uk - p / (3 * uk) + shift)
+    return roots
+
+def _quartic_roots(coefs: 'List[complex]') -> 'List[complex]':
+    # Ferrari: x = u - b / 4a, u^4 + p u^2 + q u + r = 0
+    e, d, c, b, a = coefs
+    b, c, d, e = b / a, c / a, d / a, e / a
+    shift = -b / 4
+    p = c - 3 * b * b / 8
+    q = d - b * c / 2 + b ** 3 / 8
+    r = e - b * d / 4 + b * b * c / 16 - 3 * b ** 4 / 256
+    if abs(q) <= DEFAULT_TOLERANCE * max(1, abs(p), abs(r)):
+        # Biquadratic: u^2 is a root of v^2 + p v + r
+        roots = []
+        for v in _quadratic_roots(r, p, 1):
+            s = cmath.sqrt(v)
+            roots.extend([s + shift, -s + shift])
+        return roots
+    # (u^2 + p/2 + y)^2 = (s u - q / 2s)^2 with s^2 = 2y, y root of the resolvent cubic
+    y = max(_cubic_roots([-q * q, 2 * p * p - 8 * r, 8 * p, 8]), key=abs)
+    s = cmath.sqrt(2 * y)
+    roots = _quadratic_roots(p / 2 + y + q / (2 * s), -s, 1)
+    roots += _quadratic_roots(p / 2 + y - q / (2 * s), s, 1)
+    return [u + shift for u in roots]
+
+def _initial_guesses(coefs: 'List[complex]') -> 'List[complex]':
+    # Guesses on circles whose radii follow the moduli of the roots: they
+    # are read on the upper convex hull of the points (i, log |a_i|) (Newton
+    # polygon), an edge from i to j giving j - i roots of modulus about
+    # (|a_i| / |a_j|)^(1 / (j - i)). Every radius is below the Fujiwara
+    # bound, and a single circle would leave the guesses far from the roots
+    # when their moduli are spread, where the iteration barely moves
+    points = [(i, log(abs(c))) for i, c in enumerate(coefs) if c != 0]
+    hull = []
+    for point in points:
+        while len(hull) >= 2 and \
+                (hull[-1][0] - hull[-2][0]) * (point[1] - hull[-2][1]) >= \
+                (hull[-1][1] - hull[-2][1]) * (point[0] - hull[-2][0]):
+            hull.pop()
+        hull.append(point)
+    guesses = []
+    for (i, log_i), (j, log_j) in zip(hull, hull[1:]):
+        m = j - i
+        radius = exp((log_i - log_j) / m)
+        guesses += [radius * cmath.exp(1j * (2 * pi * k / m + 0.4 + i)) for k in range(m)]
+    return guesses
+
+def _aberth_roots(coefs: 'List[complex]', tol: 'float', max_iter: 'int') -> 'List[complex]':
+    n = len(coefs) - 1
+    roots = _initial_guesses(coefs)
+    # Converged roots are not moved anymore
+    pending = set(range(n))
+    for _ in range(max_iter):
+        for k in list(pending):
+            z = roots[k]
+            ratio = _newton_ratio(coefs, z)
+            if ratio is None:
+                pending.discard(k)
+                continue
+            repulsion = sum(1 / (z - w) for j, w in enumerate(roots) if j != k and z != w)
+            step = ratio / (1 - ratio * repulsion)
+            roots[k] = z - step
+            if abs(step) <= tol * max(1, abs(z)):
+                pending.discard(k)
+        if len(pending) == 0:
+            break
+    return roots
+
+def _newton_polish(coefs: 'List[complex]', z: 'complex', tol: 'float') -> 'complex':
+    for _ in range(NEWTON_STEPS):
+        step = _newton_ratio(coefs, z)
+        if step is None:
+            break
+        # Only keep steps that improve the residue (multiple roots)
+        if _log_residue(coefs, z - step) >= _log_residue(coefs, z):
+            break
+        z -= step
+        if abs(step) <= tol * max(1, abs(z)):
+            break
+    return z
+
+def _clean(z: 'complex') -> 'complex':
+    scale = max(1, abs(z))
+    re = 0.0 if abs(z.real) <= IMAG_EPSILON * scale else z.real
+    im = 0.0 if abs(z.imag) <= IMAG_EPSILON * scale else z.imag
+    # + 0.0 turns -0.0 into 0.0
+    return complex(re + 0.0, im + 0.0)
+
+def find_roots(coefs: 'List', tol: 'float' = DEFAULT_TOLERANCE, max_iter: 'int' = MAX_ITERATIONS) -> 'List[complex]':
+    try:
+        coefs = [complex(c) for c in coefs]
+    except OverflowError:
+        raise RootFindingError(len(coefs) - 1)
+    while len(coefs) > 0 and coefs[-1] == 0:
+        coefs.pop()
+    if len(coefs) <= 1:
+        return []
+    # Factor out x^k
+    n_zeros = 0
+    while coefs[n_zeros] == 0:
+        n_zeros += 1
+    zeros = [0j] * n_zeros
+    coefs = coefs[n_zeros:]
+    degree = len(coefs) - 1
+    if degree == 0:
+        return zeros
+    elif degree == 1:
+        roots = [-coefs[0] / coefs[1]]
+    elif degree == 2:
+        roots = _quadratic_roots(*coefs)
+    elif degree == 3:
+        roots = _cubic_roots(coefs)
+    elif degree == 4:
+        roots = _quartic_roots(coefs)
+    else:
+        try:
+            roots = _aberth_roots(coefs, tol, max_iter)
+        except OverflowError:
+            raise RootFindingError(degree + n_zeros)
+    roots = [_clean(_newton_polish(coefs, z, tol)) for z in roots]
+    # The coefficients or the iteration overflowed the floats
+    if not all(cmath.isfinite(z) for z in roots):
+        raise RootFindingError(degree + n_zeros)
+    return sorted(zeros + roots, key=lambda z: (z.imag != 0, z.real, z.imag))
+
+def _exact_value(coefs: 'List[Fraction]', x: 'Fraction') -> 'Fraction':
+    res = Fraction(0)
+    for c in reversed(coefs):
+        res = res * x + c
+    return res
+
+def _deflated(coefs: 'List[Fraction]', x: 'Fraction') -> 'List[Fraction]':
+    # Quotient of the polynomial by (X - x), x being one of its roots
+    quotient = [coefs[-1]]
+    for c in reversed(coefs[1:-1]):
+        quotient.append(c + x * quotient[-1])
+    return quotient[::-1]
+
+def _is_rational_root(coefs: 'List[Fraction]', x: 'Fraction') -> 'bool':
+    # Rational root test on the coefficients scaled to integers: the
+    # numerator of a root divides a0 and its denominator divides an. The
+    # exact evaluation then decides
+    scale = lcm(*(c.denominator for c in coefs))
+    a0, an = int(coefs[0] * scale), int(coefs[-1] * scale)
+    return x != 0 and a0 % x.numerator == 0 and an % x.denominator == 0 \
+        and _exact_value(coefs, x) == 0
+
+def _convergents(x: 'Fraction', max_denominator: 'int'):
+    # Best rational approximations of x (continued fraction convergents)
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    n, d = x.numerator, x.denominator
+    while d != 0:
+        a = n // d
+        p0, q0, p1, q1 = p1, q1, a * p1 + p0, a * q1 + q0
+        if q1 > max_denominator:
+            return
+        yield Fraction(p1, q1)
+        n, d = d, n - a * d
+
+# Rational roots (exact, with multiplicity) of a polynomial with rational
+# coefficients, and numeric roots of what is left once they are divided
+# out. The candidates are the best rational approximations of the real
+# numeric roots, with a denominator that can divide the leading
+# coefficient: a numeric root only needs to be close to a rational root,
+# more so when its denominator is small. Multiple roots are less accurate:
+# the numeric roots of the quotient give new candidates as long as roots
+# are found
+def split_rational_roots(coefs: 'List', tol: 'float' = DEFAULT_TOLERANCE) -> 'Tuple[List[Fraction], List[complex]]':
+    coefs = [Fraction(c) for c in coefs]
+    while len(coefs) > 0 and coefs[-1] == 0:
+        coefs.pop()
+    rationals = []
+    while len(coefs) > 1 and coefs[0] == 0:
+        rationals.append(Fraction(0))
+        coefs = coefs[1:]
+    hints = find_roots(coefs, tol)
+    found = True
+    while found and len(coefs) > 1:
+        found = False
+        for z in hints:
+            if abs(z.imag) > IMAG_EPSILON * max(1, abs(z)) or len(coefs) == 1:
+                continue
+            an = int(coefs[-1] * lcm(*(c.denominator for c in coefs)))
+            for x in _convergents(Fraction(z.real), abs(an)):
+                while len(coefs) > 1 and _is_rational_root(coefs, x):
+                    rationals.append(x)
+                    coefs = _deflated(coefs, x)
+                    found = True
+        if found:
+            hints = find_roots(coefs, tol)
+    return sorted(rationals), hints
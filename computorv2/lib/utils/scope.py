@@ -0,0 +1,66 @@
+from itertools import count
+from typing import Iterator, MutableMapping
+
+
+# Chained context: a local frame of bindings on top of a parent mapping.
+# Lookups fall back to the parent and writes only touch the local frame,
+# so opening a scope for a function call doesn't copy the parent.
+# Every write or deletion stamps the name with a new version, so that
+# caches can tell whether a name changed since they looked at it.
+class Scope(MutableMapping):
+    __slots__ = ('frame', 'parent', 'versions')
+    stamps = count(1)
+
+    def __init__(self, frame: 'dict' = None, parent: 'MutableMapping' = None) -> None:
+        self.frame = {} if frame is None else frame
+        self.parent = parent
+        self.versions = None
+
+    def child(self, frame: 'dict') -> 'Scope':
+        return Scope(frame, self)
+
+    def __getitem__(self, key: 'str'):
+        if key in self.frame:
+            return self.frame[key]
+        if self.parent is None:
+            raise KeyError(key)
+        return self.parent[key]
+
+    def __contains__(self, key: 'str') -> 'bool':
+        return key in self.frame or (self.parent is not None and key in self.parent)
+
+    def __setitem__(self, key: 'str', value) -> None:
+        self.frame[key] = value
+        self._stamp(key)
+
+    def __delitem__(self, key: 'str') -> None:
+        del self.frame[key]
+        self._stamp(key)
+
+    def _stamp(self, key: 'str') -> None:
+        if self.versions is None:
+            self.versions = {}
+        self.versions[key] = next(Scope.stamps)
+
+    # 0 for names never written (or only given to the constructor)
+    def version(self, key: 'str') -> 'int':
+        if self.versions is not None and key in self.versions:
+            return self.versions[key]
+        if key in self.frame or not isinstance(self.parent, Scope):
+            return 0
+        return self.parent.version(key)
+
+    def __iter__(self) -> 'Iterator[str]':
+        seen = set(self.frame)
+        yield from self.frame
+        if self.parent is not None:
+            for key in self.parent:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self) -> 'int':
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> 'str':
+        return f"Scope({self.frame}, parent={self.parent!r})"
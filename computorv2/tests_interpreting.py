@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+from lib.blocks.math_types import Complex, Matrix
+from lib.interpreting import interpret, evaluate_many, builtin_functions
+from lib.utils.scope import Scope
+from lib.utils.errors import Error
+
+def try_print(fun, *args):
+    try:
+        print(fun(*args))
+    except Error as e:
+        print(e)
+
+# Float runs give the exact results, and fall back to the exact evaluation
+# where it raises
+def tests_evaluate_many():
+    print("--- Tests evaluate_many ---")
+    context = Scope({'i': Complex.i()}, parent=Scope(builtin_functions()))
+    interpret("f(x) = x ^ 2 - 3 * x + 1", context)
+    print(evaluate_many('f', [0.0, 1.5, 3.0], context))
+    interpret("g(x) = 2 ^ x", context)
+    print(evaluate_many('g', [0.0, 3.0, -1.0], context))
+    try_print(evaluate_many, 'g', [1.5], context)
+    try_print(evaluate_many, 'g', [0.5, 2.0], context)
+    interpret("h(x) = x ^ i", context)
+    try_print(evaluate_many, 'h', [2.0], context)
+    try_print(evaluate_many, 'k', [2.0], context)
+
+
+# A memoized result must not survive a change of the functions it calls
+def tests_memo_invalidation():
+    print("--- Tests memo invalidation ---")
+    context = Scope({'i': Complex.i()}, parent=Scope(builtin_functions()))
+    interpret("f(x) = det([[x, 1]; [1, x]])", context, memo_size=10)
+    print(interpret("f(3) = ?", context))
+    interpret("det(m) = 42", context, memo_size=10)
+    print(interpret("f(3) = ?", context))
+
+
+# Lines run with the float backend (-f), in a new session where p is a
+# float matrix
+def run_float_backend(lines):
+    if not Matrix.set_float_backend(True):
+        print("NumPy is not available, skipped")
+        return
+    try:
+        context = Scope({'i': Complex.i()}, parent=Scope(builtin_functions()))
+        interpret("p = [[2, 1]; [1, 3]] ** [[1, 0]; [0, 1]]", context)
+        for line in lines:
+            try_print(interpret, line, context)
+    finally:
+        Matrix.set_float_backend(False)
+
+
+# The determinant of a float matrix is a scalar of the language
+def tests_float_det():
+    print("--- Tests float backend det ---")
+    run_float_backend([
+        "det(p) = ?",
+        "det(p) + 1 = ?",
+        "1 + det(p) = ?",
+        "det(p) * [[1, 2]] = ?",
+        "f(x) = x + 1",
+        "f(det(p)) = ?",
+        "det(p) ^ 2 = ?",
+        "det(p) % 3 = ?",
+    ])
+
+
+# Complex results go back to Complexes, and division by zero raises as for
+# exact matrices
+def tests_float_complex_and_division():
+    print("--- Tests float backend complexes and division ---")
+    run_float_backend([
+        "p * i = ?",
+        "p + i = ?",
+        "[[1, i]] ** [[1]; [1]] = ?",
+        "p * (i - i) = ?",
+        "p / 3 = ?",
+        "p / 0 = ?",
+        "p / (i - i) = ?",
+    ])
+
+
+if __name__ == '__main__':
+    tests_evaluate_many()
+    print()
+    tests_memo_invalidation()
+    print()
+    tests_float_det()
+    print()
+    tests_float_complex_and_division()
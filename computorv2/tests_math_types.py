@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from lib.blocks.math_types import Rational, Complex
+from lib.blocks.math_types import Rational, Complex, decimal_str
 from lib.utils.errors import Error
 
 def tests_rationals():
@@ -21,6 +21,15 @@ def tests_rationals():
     print(r)
 
 
+# Floats (float backend matrices) are displayed like Rationals
+def tests_decimal_str():
+    print("--- Tests decimal_str ---")
+    print(decimal_str(26.0))
+    print(decimal_str(16 / 3))
+    print(decimal_str(-0.5))
+    print(decimal_str(float(Rational(1, 3))), Rational(1, 3))
+
+
 def tests_complex():
     print("--- Tests Complex ---")
     c = Complex(1)
@@ -63,6 +72,8 @@ def tests_pow():
 if __name__ == '__main__':
     tests_rationals()
     print()
+    tests_decimal_str()
+    print()
     tests_complex()
     print()
     tests_pow()
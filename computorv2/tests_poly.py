@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 
-from lib.blocks import Poly
+from lib.blocks.poly import Poly
+from lib.blocks.math_types import Rational, Complex, Matrix
 
 if __name__ == '__main__':
     print(Poly.zero())
     print(Poly.one())
     print(Poly.x())
     print(Poly({0: 1, 1: 2, 2: 1}))
+    p = Poly({0: Rational(1), 1: Rational(-3), 2: Rational(2)})
+    print(p(Rational(3)))
+    print(p(Complex(0, 1)))
+    print(p(Matrix([[Rational(1), Rational(2)], [Rational(3), Rational(4)]])))
+    print(p.evaluate_many([0.0, 1.5, 3.0]))
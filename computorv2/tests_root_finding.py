@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import os
+import random
+from fractions import Fraction
+from importlib.util import spec_from_file_location, module_from_spec
+
+from lib.blocks.poly import Poly
+from lib.utils import root_finding
+from lib.utils.errors import RootFindingError
+
+# computorv1/root_finding.py is a copy of lib/utils/root_finding.py: both
+# copies must give the same roots
+spec = spec_from_file_location("computorv1_root_finding",
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                            "..", "computorv1", "root_finding.py"))
+v1_root_finding = module_from_spec(spec)
+spec.loader.exec_module(v1_root_finding)
+
+def same_roots(coefs):
+    return root_finding.find_roots(coefs) == v1_root_finding.find_roots(coefs) \
+        and root_finding.split_rational_roots(coefs) == v1_root_finding.split_rational_roots(coefs)
+
+def roots_str(roots):
+    return "[" + ", ".join(str(r) if isinstance(r, Fraction) else Poly.complex_str(r) for r in roots) + "]"
+
+if __name__ == '__main__':
+    random.seed(42)
+    for degree in (1, 2, 3, 4, 5, 10, 50):
+        polys = [[random.randint(-9, 9) for _ in range(degree)] + [random.randint(1, 9)] for _ in range(20)]
+        print(f"degree {degree}, same roots: {all(same_roots(coefs) for coefs in polys)}")
+    print(f"x^3 - 2, same roots: {same_roots([-2, 0, 0, 1])}")
+    print(f"(x - 1)^4 (3x + 1), same roots: {same_roots([1, -1, -6, 14, -11, 3])}")
+
+    # Errors: RootFindingError in computorv2, ArithmeticError in computorv1
+    big = [10 ** 400, 0, 0, 1]
+    for module, error in ((root_finding, RootFindingError), (v1_root_finding, ArithmeticError)):
+        try:
+            module.find_roots(big)
+            print("no error")
+        except error:
+            print(f"{error.__name__} on coefficients beyond the float range")
+
+    # Rational roots are exact, the other roots numeric
+    for coefs in ([-6, 11, -6, 1], [2, -3, -3, 2], [0, 0, -2, 1], [1, 0, -2, 0, 1],
+                  [-2, 0, 0, 1], [2, -2, -1, 1], [1, -1, -6, 14, -11, 3]):
+        rationals, others = root_finding.split_rational_roots(coefs)
+        print(f"{coefs}: rational {roots_str(rationals)}, numeric {roots_str(others)}")